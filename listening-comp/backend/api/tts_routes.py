@@ -113,7 +113,7 @@ async def synthesize_speech(request: TTSRequest, background_tasks: BackgroundTas
             params = {}
         
         # Synthesize speech
-        file_path, audio_content = tts_service.synthesize_speech(
+        file_path, audio_content = await tts_service.asynthesize_speech(
             text=modified_text,
             speaking_rate=speed,
             pitch=request.pitch,
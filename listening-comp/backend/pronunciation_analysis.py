@@ -1,5 +1,7 @@
 import os
 import json
+import asyncio
+import bisect
 import difflib
 import re
 import numpy as np
@@ -10,6 +12,19 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# C++ edit-distance similarity (falls back to difflib)
+try:
+    from rapidfuzz import fuzz
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
 from .speech_recognition import JapaneseSpeechRecognition
 
 # Load environment variables
@@ -20,6 +35,82 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 if openai_api_key:
     openai.api_key = openai_api_key
 
+# Shared clients so connections are pooled across feedback requests
+_OPENAI_CLIENT = openai.OpenAI(api_key=openai_api_key) if openai_api_key else None
+_ASYNC_OPENAI_CLIENT = openai.AsyncOpenAI(api_key=openai_api_key) if openai_api_key else None
+
+# Precompiled patterns used across the analyzer
+_PUNCT_RE = re.compile(r'[\s.,!?、。！？「」『』()（）［］]')
+_OU_RE = re.compile(r'おう')
+_EI_RE = re.compile(r'えい')
+_WORD_RE = re.compile(r'\w+')
+_JP_SPLIT_RE = re.compile(r'([\s\S]*?)(?:English|英語|In English):([\s\S]*)')
+
+# Single-pass issue scanner; each group's index maps to a bit in the flags mask
+_ISSUE_RE = re.compile(r'(長音)|(っ)|(ん)|([いえ])')
+_FLAG_LONG_VOWEL = 1 << 1
+_FLAG_SOKUON = 1 << 2
+_FLAG_HATSUON = 1 << 3
+_FLAG_IE = 1 << 4
+
+def _issue_flags(text: str) -> int:
+    """Scan text once and return a bitmask of the issue markers it contains."""
+    flags = 0
+    for match in _ISSUE_RE.finditer(text):
+        flags |= 1 << match.lastindex
+    return flags
+
+# Score feedback ladder: a score below _FEEDBACK_THRESHOLDS[i] gets _FEEDBACK_MESSAGES[i]
+_FEEDBACK_THRESHOLDS = (50, 70, 80, 90)
+_FEEDBACK_MESSAGES = (
+    "発音に問題があります。もう少し練習しましょう。",
+    "理解できる発音ですが、いくつかの重要な問題があります。",
+    "良い発音です。いくつかの改善点があります。",
+    "とても良い発音です。いくつかの小さな問題がありますが、よく理解できます。",
+    "すばらしい発音です！ほぼネイティブレベルです。",
+)
+_SEVERITY_LABELS = {
+    'high': '重要',
+    'medium': '注意',
+    'low': '小さな問題'
+}
+
+# Per-word issue checks for low-confidence words: (trigger characters, type, description)
+_WORD_ISSUE_TEMPLATES = (
+    (frozenset('りれ'), 'r_l', 'Practice R sound distinction'),
+    (frozenset('ーāīūēō'), 'long_vowels', 'Maintain long vowel length'),
+    (frozenset('っ'), 'consonant_gemination', 'Hold consonant pause longer'),
+)
+
+# Pitch visualization tokens for the high and low rows
+_HIGH_TOKENS = {'H': "○ ", 'L': "  "}
+_LOW_TOKENS = {'H': "  ", 'L': "○ "}
+
+def _rhythm_score_py(durations: np.ndarray) -> float:
+    """Rhythm regularity score: 1 / (1 + variance of durations)."""
+    if durations.shape[0] < 2:
+        return 0.0
+    return 1.0 / (1.0 + float(np.var(durations)))
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _rhythm_score_nb(durations):
+        n = durations.shape[0]
+        if n < 2:
+            return 0.0
+        total = 0.0
+        for x in durations:
+            total += x
+        mean = total / n
+        variance = 0.0
+        for x in durations:
+            delta = x - mean
+            variance += delta * delta
+        variance /= n
+        return 1.0 / (1.0 + variance)
+else:
+    _rhythm_score_nb = _rhythm_score_py
+
 class JapanesePronunciationAnalyzer:
     """Analyzes Japanese pronunciation and provides feedback."""
     
@@ -56,38 +147,20 @@ class JapanesePronunciationAnalyzer:
         expected_norm = self._normalize_japanese(expected)
         actual_norm = self._normalize_japanese(actual)
         
-        # Get similarity score
-        similarity = self._calculate_similarity(expected_norm, actual_norm)
-        
-        # Find differences
+        # Get similarity score; the difflib fallback shares its matching blocks
+        # with the diff below
         matcher = difflib.SequenceMatcher(None, expected_norm, actual_norm)
-        diff = []
+        similarity = self._calculate_similarity(expected_norm, actual_norm, matcher)
         
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag == 'equal':
-                diff.append({
-                    'type': 'equal',
-                    'expected': expected_norm[i1:i2],
-                    'actual': actual_norm[j1:j2]
-                })
-            elif tag == 'replace':
-                diff.append({
-                    'type': 'replace',
-                    'expected': expected_norm[i1:i2],
-                    'actual': actual_norm[j1:j2]
-                })
-            elif tag == 'delete':
-                diff.append({
-                    'type': 'delete',
-                    'expected': expected_norm[i1:i2],
-                    'actual': ''
-                })
-            elif tag == 'insert':
-                diff.append({
-                    'type': 'insert',
-                    'expected': '',
-                    'actual': actual_norm[j1:j2]
-                })
+        # Find differences
+        diff = [
+            {
+                'type': tag,
+                'expected': expected_norm[i1:i2] if tag != 'insert' else '',
+                'actual': actual_norm[j1:j2] if tag != 'delete' else ''
+            }
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        ]
         
         return {
             'similarity': similarity,
@@ -111,27 +184,34 @@ class JapanesePronunciationAnalyzer:
         # In a real implementation, you'd convert kanji to hiragana here
         
         # Remove whitespace and punctuation
-        text = re.sub(r'[\s.,!?、。！？「」『』()（）［］]', '', text)
+        text = _PUNCT_RE.sub('', text)
         
         # Normalize long vowels (e.g., おうさま -> おおさま)
         # This is a simplified approach
-        text = re.sub(r'おう', 'おお', text)
-        text = re.sub(r'えい', 'ええ', text)
+        text = _OU_RE.sub('おお', text)
+        text = _EI_RE.sub('ええ', text)
         
         return text.lower()
     
-    def _calculate_similarity(self, text1: str, text2: str) -> float:
+    def _calculate_similarity(self,
+                              text1: str,
+                              text2: str,
+                              matcher: Optional[difflib.SequenceMatcher] = None) -> float:
         """
         Calculate similarity between two text strings.
         
         Args:
             text1: First text
             text2: Second text
+            matcher: SequenceMatcher already built for the two texts (difflib fallback)
             
         Returns:
             Similarity score between 0 and 1
         """
-        matcher = difflib.SequenceMatcher(None, text1, text2)
+        if RAPIDFUZZ_AVAILABLE:
+            return fuzz.ratio(text1, text2) / 100.0
+        
+        matcher = matcher or difflib.SequenceMatcher(None, text1, text2)
         return matcher.ratio()
     
     def analyze_audio_pronunciation(self, audio_data: Any, expected_text: str) -> Dict[str, Any]:
@@ -152,7 +232,27 @@ class JapanesePronunciationAnalyzer:
             return {"error": transcription_result["error"]}
         
         actual_text = transcription_result.get("text", "")
-        
+
+        # Fast path: a perfect transcription needs no diffing or issue heuristics
+        expected_norm = self._normalize_japanese(expected_text)
+        if expected_norm == self._normalize_japanese(actual_text):
+            confidence = self.speech_recognition.get_pronunciation_confidence(transcription_result)
+            score = round((0.7 + confidence * 0.3) * 100)
+            return {
+                'expected_text': expected_text,
+                'transcribed_text': actual_text,
+                'similarity': 100,
+                'confidence': round(confidence * 100),
+                'score': score,
+                'issues': [],
+                'differences': [{
+                    'type': 'equal',
+                    'expected': expected_norm,
+                    'actual': expected_norm
+                }],
+                'feedback': self._generate_feedback(score, [])
+            }
+
         # Compare with expected text
         comparison = self.compare_text(expected_text, actual_text)
         
@@ -180,36 +280,55 @@ class JapanesePronunciationAnalyzer:
         
         return result
     
-    def _identify_pronunciation_issues(self, expected: str, actual: str, comparison: Dict[str, Any]) -> List[Dict[str, str]]:
+    def _identify_pronunciation_issues(self, 
+                                       expected: str, 
+                                       actual: str, 
+                                       comparison: Dict[str, Any]) -> List[Dict[str, str]]:
         """
         Identify specific pronunciation issues.
         
         Args:
             expected: Expected text
             actual: Actual text
-            comparison: Comparison result
+            comparison: Comparison result; when it carries compare_text's diff
+                segments, only the replaced or deleted ones are scanned
             
         Returns:
             List of identified issues
         """
         issues = []
         
+        differences = comparison.get('differences')
+        if differences is not None:
+            # Only segments that did not match can contain missing sounds
+            expected_flags = 0
+            missing_flags = 0
+            for segment in differences:
+                if segment['type'] in ('replace', 'delete'):
+                    segment_flags = _issue_flags(segment['expected'])
+                    expected_flags |= segment_flags
+                    missing_flags |= segment_flags & ~_issue_flags(segment['actual'])
+        else:
+            # Scan each text once for every issue marker
+            expected_flags = _issue_flags(expected)
+            missing_flags = expected_flags & ~_issue_flags(actual)
+        
         # Look for common Japanese pronunciation issues
-        if '長音' in expected and '長音' not in actual:
+        if missing_flags & _FLAG_LONG_VOWEL:
             issues.append({
                 'type': '長音',
                 'description': 'Long vowel sounds missing or incorrect',
                 'severity': 'high'
             })
         
-        if 'っ' in expected and 'っ' not in actual:
+        if missing_flags & _FLAG_SOKUON:
             issues.append({
                 'type': '促音',
                 'description': 'Glottal stops (small tsu) missing or incorrect',
                 'severity': 'high'
             })
         
-        if 'ん' in expected and 'ん' not in actual:
+        if missing_flags & _FLAG_HATSUON:
             issues.append({
                 'type': '撥音',
                 'description': 'N sounds missing or incorrect',
@@ -217,7 +336,7 @@ class JapanesePronunciationAnalyzer:
             })
         
         # Check for common vowel confusions
-        if re.search(r'[いえ]', expected) and comparison['similarity'] < 0.9:
+        if expected_flags & _FLAG_IE and comparison['similarity'] < 0.9:
             issues.append({
                 'type': '混同母音',
                 'description': 'Similar vowel sounds confused (e.g., i/e)',
@@ -253,27 +372,13 @@ class JapanesePronunciationAnalyzer:
         Returns:
             Feedback string
         """
-        if score >= 90:
-            feedback = "すばらしい発音です！ほぼネイティブレベルです。"
-        elif score >= 80:
-            feedback = "とても良い発音です。いくつかの小さな問題がありますが、よく理解できます。"
-        elif score >= 70:
-            feedback = "良い発音です。いくつかの改善点があります。"
-        elif score >= 50:
-            feedback = "理解できる発音ですが、いくつかの重要な問題があります。"
-        else:
-            feedback = "発音に問題があります。もう少し練習しましょう。"
+        feedback = _FEEDBACK_MESSAGES[bisect.bisect_right(_FEEDBACK_THRESHOLDS, score)]
         
         # Add specific issue feedback
         if issues:
             feedback += " 特に注意すべき点：\n"
             for issue in issues:
-                severity = {
-                    'high': '重要',
-                    'medium': '注意',
-                    'low': '小さな問題'
-                }.get(issue.get('severity', 'medium'), '')
-                
+                severity = _SEVERITY_LABELS.get(issue.get('severity', 'medium'), '')
                 feedback += f"- {severity}: {issue['description']}\n"
         
         return feedback
@@ -291,11 +396,64 @@ class JapanesePronunciationAnalyzer:
             Detailed feedback from LLM
         """
         try:
+            if _OPENAI_CLIENT is None:
+                raise ValueError("OPENAI_API_KEY is not set")
+            
+            # Basic comparison
+            comparison = self.compare_text(expected, actual)
+            
+            # Generate LLM feedback
+            response = _OPENAI_CLIENT.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": self._build_feedback_prompt(expected, actual, comparison)}],
+                timeout=30,
+            )
+            
+            return self._parse_llm_feedback(response.choices[0].message.content, comparison)
+            
+        except Exception as e:
+            return {
+                'error': str(e),
+                'feedback': "詳細なフィードバックを生成できませんでした。/ Could not generate detailed feedback."
+            }
+    
+    async def get_detailed_feedback_llm_async(self, expected: str, actual: str, audio_data: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Asynchronously get detailed pronunciation feedback using LLM.
+        
+        Args:
+            expected: Expected text
+            actual: Actual text
+            audio_data: Optional audio data for additional analysis
+            
+        Returns:
+            Detailed feedback from LLM
+        """
+        try:
+            if _ASYNC_OPENAI_CLIENT is None:
+                raise ValueError("OPENAI_API_KEY is not set")
+            
             # Basic comparison
             comparison = self.compare_text(expected, actual)
             
-            # Prepare prompt for LLM
-            prompt = f"""
+            # Generate LLM feedback
+            response = await _ASYNC_OPENAI_CLIENT.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": self._build_feedback_prompt(expected, actual, comparison)}],
+                timeout=30,
+            )
+            
+            return self._parse_llm_feedback(response.choices[0].message.content, comparison)
+            
+        except Exception as e:
+            return {
+                'error': str(e),
+                'feedback': "詳細なフィードバックを生成できませんでした。/ Could not generate detailed feedback."
+            }
+    
+    def _build_feedback_prompt(self, expected: str, actual: str, comparison: Dict[str, Any]) -> str:
+        """Build the LLM prompt for detailed pronunciation feedback."""
+        return f"""
             あなたは日本語の発音を評価する専門家です。以下の発音を評価してください：
 
             期待されるテキスト：{expected}
@@ -312,37 +470,38 @@ class JapanesePronunciationAnalyzer:
 
             改善のための具体的な練習方法も提案してください。
             """
+    
+    def _parse_llm_feedback(self, feedback: str, comparison: Dict[str, Any]) -> Dict[str, Any]:
+        """Split LLM feedback into Japanese and English sections when possible."""
+        japanese_feedback = feedback
+        english_feedback = feedback
+        
+        # Try to split feedback by language
+        jp_section_match = _JP_SPLIT_RE.search(feedback)
+        if jp_section_match:
+            japanese_feedback = jp_section_match.group(1).strip()
+            english_feedback = jp_section_match.group(2).strip()
+        
+        return {
+            'similarity': comparison['similarity'],
+            'japanese_feedback': japanese_feedback,
+            'english_feedback': english_feedback,
+            'full_feedback': feedback
+        }
+    
+    async def batch_feedback(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Get detailed LLM feedback for several (expected, actual) pairs concurrently.
+        
+        Args:
+            pairs: List of (expected, actual) text pairs
             
-            # Generate LLM feedback
-            response = openai.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-            )
-            
-            feedback = response.choices[0].message.content
-            
-            # Separate Japanese and English feedback if possible
-            japanese_feedback = feedback
-            english_feedback = feedback
-            
-            # Try to split feedback by language
-            jp_section_match = re.search(r'([\s\S]*?)(?:English|英語|In English):([\s\S]*)', feedback)
-            if jp_section_match:
-                japanese_feedback = jp_section_match.group(1).strip()
-                english_feedback = jp_section_match.group(2).strip()
-            
-            return {
-                'similarity': comparison['similarity'],
-                'japanese_feedback': japanese_feedback,
-                'english_feedback': english_feedback,
-                'full_feedback': feedback
-            }
-            
-        except Exception as e:
-            return {
-                'error': str(e),
-                'feedback': "詳細なフィードバックを生成できませんでした。/ Could not generate detailed feedback."
-            }
+        Returns:
+            List of feedback dictionaries, in the same order as the input pairs
+        """
+        return await asyncio.gather(
+            *(self.get_detailed_feedback_llm_async(expected, actual) for expected, actual in pairs)
+        )
     
     def generate_pitch_pattern_visualization(self, text: str) -> Dict[str, Any]:
         """
@@ -360,7 +519,7 @@ class JapanesePronunciationAnalyzer:
             # This is a placeholder implementation
             
             # For educational purposes, we'll generate some mock data
-            words = re.findall(r'\w+', text)
+            words = _WORD_RE.findall(text)
             patterns = []
             
             for word in words:
@@ -415,43 +574,32 @@ class JapanesePronunciationAnalyzer:
         Returns:
             ASCII visualization of pitch patterns
         """
-        result = ""
+        result_parts = []
         
         for word_data in patterns:
             word = word_data['word']
             pattern = word_data['pattern']
             
             # Create top line (high positions)
-            high_line = ""
-            for i, p in enumerate(pattern):
-                if p == 'H':
-                    high_line += "○ "
-                else:
-                    high_line += "  "
+            high_line = ''.join([_HIGH_TOKENS.get(p, "  ") for p in pattern])
             
             # Create bottom line (low positions)
-            low_line = ""
-            for i, p in enumerate(pattern):
-                if p == 'L':
-                    low_line += "○ "
-                else:
-                    low_line += "  "
+            low_line = ''.join([_LOW_TOKENS.get(p, "  ") for p in pattern])
             
             # Create middle line (word with spaces)
             word_line = " ".join(word) + " "
             
             # Add connecting lines
-            connect_line = ""
-            for i in range(len(pattern) - 1):
-                if pattern[i] != pattern[i+1]:
-                    connect_line += "/ "
-                else:
-                    connect_line += "  "
-            connect_line += "  "
+            connect_parts = [
+                "/ " if pattern[i] != pattern[i + 1] else "  "
+                for i in range(len(pattern) - 1)
+            ]
+            connect_parts.append("  ")
+            connect_line = ''.join(connect_parts)
             
-            result += f"{high_line}\n{word_line}\n{low_line}\n{connect_line}\n"
+            result_parts.append(f"{high_line}\n{word_line}\n{low_line}\n{connect_line}\n")
         
-        return result
+        return ''.join(result_parts)
     
     def analyze_pronunciation(self, 
                             transcript: str, 
@@ -530,26 +678,14 @@ class JapanesePronunciationAnalyzer:
         for word, score in confidence_scores.items():
             if score < 0.7:  # Low confidence threshold
                 # Check for specific pronunciation challenges
-                if 'り' in word or 'れ' in word:
-                    issues.append({
-                        "type": "r_l",
-                        "word": word,
-                        "description": "Practice R sound distinction"
-                    })
-                    
-                if 'ー' in word or any(c in word for c in ['ā', 'ī', 'ū', 'ē', 'ō']):
-                    issues.append({
-                        "type": "long_vowels",
-                        "word": word,
-                        "description": "Maintain long vowel length"
-                    })
-                    
-                if 'っ' in word:
-                    issues.append({
-                        "type": "consonant_gemination",
-                        "word": word,
-                        "description": "Hold consonant pause longer"
-                    })
+                word_chars = set(word)
+                for chars, issue_type, description in _WORD_ISSUE_TEMPLATES:
+                    if not word_chars.isdisjoint(chars):
+                        issues.append({
+                            "type": issue_type,
+                            "word": word,
+                            "description": description
+                        })
         
         return issues
     
@@ -600,10 +736,8 @@ class JapanesePronunciationAnalyzer:
         if not durations or len(durations) < 2:
             return 0.0
             
-        # Calculate variance in durations
-        variance = np.var(durations)
-        # Convert to a score between 0 and 1 (lower variance = higher score)
-        return 1.0 / (1.0 + variance)
+        # Lower variance in durations = higher score, computed in a single JIT pass
+        return float(_rhythm_score_nb(np.ascontiguousarray(durations, dtype=np.float64)))
     
     def _evaluate_pace(self, durations: List[float]) -> str:
         """Evaluate speaking pace."""
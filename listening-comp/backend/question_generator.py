@@ -1,17 +1,98 @@
 import os
+import sys
 import json
 import asyncio
-from typing import List, Dict, Any, Optional
+import copy
+import hashlib
+import pickle
+import string
+import time
+from types import MappingProxyType
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, AsyncIterator
+import httpx
 import openai
 from dotenv import load_dotenv
 import logging
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Supported JLPT levels
+JLPT_LEVELS = frozenset({"N1", "N2", "N3", "N4", "N5"})
+_INVALID_LEVEL_MESSAGE = "Invalid JLPT level: {}. Must be one of: N1, N2, N3, N4, N5"
+
+# Canonical question fields and the alternative names the model sometimes uses
+_FIELD_ALIASES = {
+    "questionJapanese": ("question_japanese", "japanese_question", "question"),
+    "questionEnglish": ("question_english", "english_question", "translation"),
+    "options": ("choices", "answers", "answer_choices")
+}
+
+# Option IDs: A, B, C, D...
+_OPTION_IDS = string.ascii_uppercase
+
+class _QuestionStreamParser:
+    """
+    Incrementally extract complete question objects from streamed JSON text.
+    
+    Recognizes objects inside a top-level array, or inside an array value of a
+    top-level object (e.g. {"questions": [...]}), and returns each object's raw
+    JSON text as soon as its closing brace arrives.
+    """
+    
+    def __init__(self):
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._current: Optional[List[str]] = None
+    
+    def _at_question_level(self) -> bool:
+        stack = self._stack
+        return bool(stack) and stack[-1] == "[" and (
+            len(stack) == 1 or (len(stack) == 2 and stack[0] == "{")
+        )
+    
+    def feed(self, text: str) -> List[str]:
+        """Consume a chunk of text and return any question objects completed by it"""
+        completed = []
+        for ch in text:
+            if self._in_string:
+                if self._current is not None:
+                    self._current.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            
+            if ch == "{" and self._current is None and self._at_question_level():
+                self._current = []
+            if self._current is not None:
+                self._current.append(ch)
+            
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._current is not None and self._at_question_level():
+                    completed.append("".join(self._current))
+                    self._current = None
+        return completed
 
 class QuestionGenerator:
     """
@@ -21,15 +102,30 @@ class QuestionGenerator:
     def __init__(self):
         """Initialize the question generator with API key"""
         self.api_key = os.getenv("OPENAI_API_KEY")
+        if not self.api_key:
+            # Only touch the .env file when the environment doesn't provide the key
+            load_dotenv()
+            self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
             
         # Initialize OpenAI with old API version
         openai.api_key = self.api_key
         self.model = "gpt-3.5-turbo"
+        # Smaller, cheaper model for the fixed, low-stakes JLPT sample questions
+        self.sample_model = "gpt-4o-mini"
         
-        # Define JLPT levels and their characteristics
-        self.jlpt_levels = {
+        # Native async client sharing one HTTP/2 connection pool across requests
+        self.client = openai.AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+            )
+        )
+        
+        # Define JLPT levels and their characteristics (read-only after init)
+        self.jlpt_levels = MappingProxyType({
             "N5": {
                 "vocab_range": "800-1000 words",
                 "kanji": "100-200 kanji",
@@ -60,7 +156,64 @@ class QuestionGenerator:
                 "grammar": "complex structures",
                 "description": "Advanced Japanese, close to native fluency"
             }
-        }
+        })
+        
+        # Byte-identical system prompt shared by every request so OpenAI can cache the prefix
+        self._system_prompt = sys.intern(self._create_system_prompt())
+        
+        # Per-level lines appended to each user message, built once up front
+        self._level_prompts = MappingProxyType({
+            level: sys.intern(self._create_level_prompt(level)) for level in self.jlpt_levels
+        })
+        
+        # Static fragments of the question-generation user prompt, joined around the
+        # per-request transcript, question count and level line
+        self._question_prompt_head = """
+        Japanese transcript:
+        """
+        self._question_prompt_body = """
+        
+        Generate {num_questions} Japanese listening comprehension questions based on this transcript.
+        
+        For each question, provide:
+        1. The question in Japanese
+        2. The question in English translation
+        3. 4 multiple-choice options in Japanese
+        4. The correct answer
+        5. An explanation of the answer in English
+        
+        Format the output as a valid JSON array where each question is an object.
+        
+        """
+        self._question_prompt_end = """
+        """
+        
+        # Bounded LRU cache of generated questions, keyed by request parameters
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_maxsize = 256
+        
+        # Futures for generations currently in progress, so identical requests share one call
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        
+        # Latest Responses API response per JLPT level, used to chain sample
+        # generation as a follow-up:
+        # level -> (response id, created at, chain length, input tokens of that response)
+        self._last_response_ids: Dict[str, tuple] = {}
+        self._response_chain_ttl = 3600  # seconds
+        self._response_chain_max_length = 5
+        self._response_chain_token_budget = 6000
+        
+        # Micro-batching: requests arriving within a short window share one OpenAI call.
+        # A batch is capped by its total question count so the response fits the
+        # completion budget (max_tokens scales with the questions requested)
+        self._batch_queue: asyncio.Queue = asyncio.Queue()
+        self._batch_window = 0.05  # seconds to wait for more requests
+        self._batch_max_size = 8
+        self._batch_max_questions = 10
+        self._tokens_per_question = 400
+        self._min_max_tokens = 2000
+        self._batch_worker_task: Optional[asyncio.Task] = None
+        self._batch_tasks: set = set()
     
     async def generate(self, 
                        transcript: str, 
@@ -79,20 +232,223 @@ class QuestionGenerator:
         Returns:
             List of question objects with question text, answer options, and correct answers
         """
-        # Clean and truncate the transcript if it's too long
-        max_length = 4000  # Adjust based on token limits and safety margin
-        if len(transcript) > max_length:
-            transcript = transcript[:max_length] + "..."
+        # Serve repeated requests from the cache
+        cache_key = self._make_cache_key(transcript, jlpt_level, num_questions, include_answers)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Question cache hit for level {jlpt_level}")
+            return cached
         
-        # Create the prompt based on JLPT level
-        system_prompt = self._create_system_prompt(jlpt_level)
+        # Join an identical request that is already waiting on OpenAI
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            logger.info(f"Joining in-flight question generation for level {jlpt_level}")
+            return copy.deepcopy(await asyncio.shield(pending))
         
-        user_prompt = f"""
-        Japanese transcript:
-        {transcript}
+        # No await between the lookup above and registration, so this is atomic on the event loop
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            questions = await self._generate_uncached(
+                cache_key, transcript, jlpt_level, num_questions, include_answers
+            )
+            future.set_result(questions)
+            return questions
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(cache_key, None)
+    
+    async def _generate_uncached(self,
+                                 cache_key: tuple,
+                                 transcript: str,
+                                 jlpt_level: str,
+                                 num_questions: int,
+                                 include_answers: bool) -> List[Dict[str, Any]]:
+        """Generate questions with OpenAI, caching the result or falling back on failure"""
+        try:
+            # Queue the request for the batch worker and wait for its questions
+            questions = await self._submit_to_batch({
+                "transcript": transcript,
+                "jlpt_level": jlpt_level,
+                "num_questions": num_questions,
+                "include_answers": include_answers
+            })
+            
+            self._cache_put(cache_key, questions)
+            return questions
+            
+        except Exception as e:
+            logger.error(f"Failed to generate questions: {str(e)}")
+            # Return fallback questions if API fails
+            fallback = self._get_fallback_questions(jlpt_level, num_questions)
+            logger.info(f"Using {len(fallback)} fallback questions for level {jlpt_level}")
+            return fallback
+    
+    async def generate_stream(self,
+                              transcript: str,
+                              jlpt_level: str = "N4",
+                              num_questions: int = 5,
+                              include_answers: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate Japanese comprehension questions, yielding each one as soon as it is complete
         
-        Generate {num_questions} Japanese listening comprehension questions based on this transcript.
-        Target JLPT level: {jlpt_level}
+        Streaming requests bypass the micro-batcher: a batched response can only be
+        split per transcript once it is complete, which would defeat streaming.
+        Identical requests are still served from the question cache.
+        
+        Args:
+            transcript: Text transcript to generate questions from
+            jlpt_level: JLPT level (N1-N5) to target
+            num_questions: Number of questions to generate
+            include_answers: Whether to include answers
+            
+        Yields:
+            Question objects, in the order the model produces them
+        """
+        cache_key = self._make_cache_key(transcript, jlpt_level, num_questions, include_answers)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Question cache hit for level {jlpt_level}")
+            for question in cached:
+                yield question
+            return
+        
+        user_prompt = self._build_question_prompt(transcript, jlpt_level, num_questions)
+        parser = _QuestionStreamParser()
+        chunks = []
+        questions = []
+        
+        try:
+            max_tokens = max(self._min_max_tokens, self._tokens_per_question * num_questions)
+            async for delta in self._stream_openai_api(self._system_prompt, user_prompt, max_tokens=max_tokens):
+                chunks.append(delta)
+                for raw_question in parser.feed(delta):
+                    question = self._process_question(_json_loads(raw_question), include_answers)
+                    questions.append(question)
+                    yield question
+            
+            # The model may answer with a shape the stream parser doesn't recognize
+            if not questions:
+                questions = self._parse_response("".join(chunks), include_answers)
+                for question in questions:
+                    yield question
+            
+            self._cache_put(cache_key, questions)
+            
+        except Exception as e:
+            logger.error(f"Failed to stream questions: {str(e)}")
+            if not questions:
+                fallback = self._get_fallback_questions(jlpt_level, num_questions)
+                logger.info(f"Using {len(fallback)} fallback questions for level {jlpt_level}")
+                for question in fallback:
+                    yield question
+    
+    async def close(self) -> None:
+        """Stop the batch worker and close the underlying HTTP client"""
+        if self._batch_worker_task is not None:
+            self._batch_worker_task.cancel()
+        await self.client.close()
+    
+    async def _submit_to_batch(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Enqueue a generation request and wait for the batch worker to resolve it"""
+        if self._batch_worker_task is None or self._batch_worker_task.done():
+            self._batch_worker_task = asyncio.create_task(self._batch_worker())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._batch_queue.put((request, future))
+        return await future
+    
+    async def _batch_worker(self) -> None:
+        """Collect queued requests for up to one batch window and dispatch them per JLPT level"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._batch_queue.get()]
+            # Only hold a request back when there is concurrent load to batch it with
+            idle = not self._batch_tasks and self._batch_queue.empty()
+            deadline = loop.time() + (0 if idle else self._batch_window)
+            while len(batch) < self._batch_max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._batch_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Only requests for the same level can share a prompt
+            groups: Dict[str, list] = {}
+            for request, future in batch:
+                groups.setdefault(request["jlpt_level"], []).append((request, future))
+            
+            for level_group in groups.values():
+                for group in self._split_by_question_budget(level_group):
+                    task = asyncio.create_task(self._run_batch(group))
+                    self._batch_tasks.add(task)
+                    task.add_done_callback(self._batch_tasks.discard)
+    
+    def _split_by_question_budget(self, group: List[tuple]) -> List[List[tuple]]:
+        """Pack same-level requests into batches of at most _batch_max_questions questions"""
+        batches = []
+        current = []
+        total = 0
+        for request, future in group:
+            if current and total + request["num_questions"] > self._batch_max_questions:
+                batches.append(current)
+                current = []
+                total = 0
+            current.append((request, future))
+            total += request["num_questions"]
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _run_batch(self, group: List[tuple]) -> None:
+        """Generate questions for a group of same-level requests with a single OpenAI call"""
+        requests = [request for request, _ in group]
+        max_tokens = max(
+            self._min_max_tokens,
+            self._tokens_per_question * sum(request["num_questions"] for request in requests)
+        )
+        try:
+            if len(requests) == 1:
+                request = requests[0]
+                user_prompt = self._build_question_prompt(
+                    request["transcript"], request["jlpt_level"], request["num_questions"]
+                )
+                response = await self._call_openai_api(self._system_prompt, user_prompt, max_tokens=max_tokens)
+                results = [self._parse_response(response, request["include_answers"])]
+            else:
+                logger.info(f"Batching {len(requests)} question requests for level {requests[0]['jlpt_level']}")
+                user_prompt = self._build_batch_prompt(requests)
+                response = await self._call_openai_api(self._system_prompt, user_prompt, max_tokens=max_tokens)
+                results = self._parse_batch_response(response, requests)
+            
+            for (_, future), questions in zip(group, results):
+                if future.done():
+                    continue
+                if questions is None:
+                    future.set_exception(ValueError("Batch response is missing questions for this transcript"))
+                else:
+                    future.set_result(questions)
+                    
+        except Exception as e:
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+    
+    def _build_batch_prompt(self, requests: List[Dict[str, Any]]) -> str:
+        """Build one user prompt covering several same-level transcripts"""
+        transcripts = "\n".join(
+            f"""
+        Transcript {index} ({request['num_questions']} questions):
+        {self._truncate_transcript(request['transcript'])}"""
+            for index, request in enumerate(requests)
+        )
+        
+        return f"""
+        Generate Japanese listening comprehension questions for each of the following {len(requests)} transcripts.
+        {transcripts}
         
         For each question, provide:
         1. The question in Japanese
@@ -101,24 +457,74 @@ class QuestionGenerator:
         4. The correct answer
         5. An explanation of the answer in English
         
-        Format the output as a valid JSON array where each question is an object.
-        """
+        Format the output as a valid JSON object of the form
+        {{"results": [{{"index": 0, "questions": [...]}}, ...]}} with one entry per transcript.
         
+        {self._get_level_prompt(requests[0]['jlpt_level'])}
+        """
+    
+    def _parse_batch_response(self,
+                              response_text: str,
+                              requests: List[Dict[str, Any]]) -> List[Optional[List[Dict[str, Any]]]]:
+        """Split a batched response into per-request question lists (None where missing)"""
         try:
-            # Call the OpenAI API
-            response = await self._call_openai_api(system_prompt, user_prompt)
-            
-            # Parse the response to extract the questions
-            questions = self._parse_response(response, include_answers)
-            
-            return questions
-            
-        except Exception as e:
-            logger.error(f"Failed to generate questions: {str(e)}")
-            # Return fallback questions if API fails
-            fallback = self._get_fallback_questions(jlpt_level, num_questions)
-            logger.info(f"Using {len(fallback)} fallback questions for level {jlpt_level}")
-            return fallback
+            response_data = _json_loads(response_text)
+        except _JSONDecodeError as e:
+            raise ValueError(f"Failed to parse JSON response: {str(e)}")
+        
+        results = response_data.get("results", []) if isinstance(response_data, dict) else response_data
+        questions_by_index = {
+            entry.get("index"): entry.get("questions")
+            for entry in results
+            if isinstance(entry, dict)
+        }
+        
+        parsed = []
+        for index, request in enumerate(requests):
+            questions = questions_by_index.get(index)
+            if not isinstance(questions, list):
+                parsed.append(None)
+                continue
+            parsed.append([
+                self._process_question(question, request["include_answers"]) for question in questions
+            ])
+        return parsed
+    
+    def _make_cache_key(self,
+                        transcript: str,
+                        jlpt_level: str,
+                        num_questions: int,
+                        include_answers: bool) -> tuple:
+        """Build the cache key for a question generation request"""
+        return (
+            hashlib.blake2b(transcript.encode("utf-8"), digest_size=16).digest(),
+            jlpt_level,
+            num_questions,
+            include_answers
+        )
+    
+    def _truncate_transcript(self, transcript: str) -> str:
+        """Clean and truncate the transcript if it's too long"""
+        max_length = 4000  # Adjust based on token limits and safety margin
+        if len(transcript) <= max_length:
+            return transcript
+        
+        # Cut after the last full stop within the limit so the model sees whole sentences;
+        # rfind scans in place, so only the kept prefix is copied
+        cut = transcript.rfind("。", 0, max_length)
+        end = cut + 1 if cut > 0 else max_length
+        return f"{transcript[:end]}…"
+    
+    def _build_question_prompt(self, transcript: str, jlpt_level: str, num_questions: int) -> str:
+        """Build the user prompt for generating questions from a transcript"""
+        # Per-request details go in the user message; the system prompt stays constant
+        return "".join((
+            self._question_prompt_head,
+            self._truncate_transcript(transcript),
+            self._question_prompt_body.format(num_questions=num_questions),
+            self._get_level_prompt(jlpt_level),
+            self._question_prompt_end
+        ))
     
     async def get_by_jlpt_level(self, jlpt_level: str) -> Dict[str, Any]:
         """
@@ -130,14 +536,14 @@ class QuestionGenerator:
         Returns:
             Information about the JLPT level and sample questions
         """
-        if jlpt_level not in self.jlpt_levels:
-            raise ValueError(f"Invalid JLPT level: {jlpt_level}. Must be one of: N1, N2, N3, N4, N5")
+        if jlpt_level not in JLPT_LEVELS:
+            raise ValueError(_INVALID_LEVEL_MESSAGE.format(jlpt_level))
             
         level_info = self.jlpt_levels[jlpt_level]
         
         # Generate a few sample questions for this level
         sample_prompt = f"""
-        Generate 2 sample Japanese listening comprehension questions at JLPT level {jlpt_level}.
+        Generate 2 sample Japanese listening comprehension questions.
         Create fictional dialogue snippets as context, then questions about them.
         
         For each question, provide:
@@ -149,13 +555,15 @@ class QuestionGenerator:
         6. An explanation of the answer in English
         
         Format the output as a valid JSON array where each question is an object.
-        """
         
-        system_prompt = self._create_system_prompt(jlpt_level)
+        {self._get_level_prompt(jlpt_level)}
+        """
         
         try:
-            # Call the OpenAI API
-            response = await self._call_openai_api(system_prompt, sample_prompt)
+            # Call the OpenAI API as a follow-up to the previous samples for this level
+            response = await self._call_responses_api(
+                self._system_prompt, sample_prompt, jlpt_level, model=self.sample_model
+            )
             
             # Parse the response to extract the questions
             sample_questions = self._parse_response(response, True)
@@ -169,58 +577,178 @@ class QuestionGenerator:
         except Exception as e:
             raise Exception(f"Failed to generate sample questions: {str(e)}")
     
-    async def _call_openai_api(self, system_prompt: str, user_prompt: str) -> str:
+    async def _call_responses_api(self,
+                                  system_prompt: str,
+                                  user_prompt: str,
+                                  conversation_key: str,
+                                  model: Optional[str] = None) -> str:
+        """
+        Call the OpenAI Responses API, continuing the previous response for conversation_key
+        
+        Chaining with previous_response_id saves resending prior turns over the wire and
+        keeps follow-ups consistent with earlier samples, but it does not save tokens:
+        every referenced turn is billed again as input on each follow-up, so a chained
+        call costs more than a fresh one and the cost grows with the chain. Chains are
+        therefore reset after a TTL, a maximum length, or once a response's input
+        exceeds _response_chain_token_budget tokens.
+        """
+        previous = self._last_response_ids.get(conversation_key)
+        previous_id = None
+        chain_length = 0
+        if previous is not None:
+            response_id, created_at, length, input_tokens = previous
+            if (time.monotonic() - created_at < self._response_chain_ttl
+                    and length < self._response_chain_max_length
+                    and input_tokens < self._response_chain_token_budget):
+                previous_id = response_id
+                chain_length = length
+        
+        try:
+            response = await self.client.responses.create(
+                model=model or self.model,
+                instructions=system_prompt,
+                input=user_prompt,
+                previous_response_id=previous_id,
+                temperature=0.7,
+                max_output_tokens=2000
+            )
+        except Exception as e:
+            if previous_id is None:
+                raise Exception(f"OpenAI API call failed: {str(e)}")
+            # The stored response may have expired server-side; start a new chain
+            logger.warning(f"Follow-up response failed, starting a new chain: {str(e)}")
+            self._last_response_ids.pop(conversation_key, None)
+            return await self._call_responses_api(system_prompt, user_prompt, conversation_key, model)
+        
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", None) or 0
+        self._last_response_ids[conversation_key] = (
+            response.id, time.monotonic(), chain_length + 1, input_tokens
+        )
+        return response.output_text
+    
+    async def _call_openai_api(self,
+                               system_prompt: str,
+                               user_prompt: str,
+                               model: Optional[str] = None,
+                               max_tokens: int = 2000) -> str:
         """Call the OpenAI API with the given prompts"""
+        return "".join([
+            delta async for delta in self._stream_openai_api(system_prompt, user_prompt, model, max_tokens)
+        ])
+    
+    async def _stream_openai_api(self,
+                                 system_prompt: str,
+                                 user_prompt: str,
+                                 model: Optional[str] = None,
+                                 max_tokens: int = 2000) -> AsyncIterator[str]:
+        """Stream response text from the OpenAI API as it is generated"""
         try:
-            client = openai.OpenAI(api_key=self.api_key)
-            
-            response = await client.chat.completions.create(
-                model=self.model,
+            stream = await self.client.chat.completions.create(
+                model=model or self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.7,
-                max_tokens=2000
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
             )
             
-            return response.choices[0].message.content
+            async for chunk in stream:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+                elif chunk.usage:
+                    # Report how much of the prompt was served from OpenAI's prefix cache
+                    details = getattr(chunk.usage, "prompt_tokens_details", None)
+                    if details:
+                        logger.info(
+                            f"Prompt cache: {details.cached_tokens or 0}/{chunk.usage.prompt_tokens} tokens cached"
+                        )
             
         except Exception as e:
             raise Exception(f"OpenAI API call failed: {str(e)}")
     
-    def _create_system_prompt(self, jlpt_level: str) -> str:
-        """Create a system prompt based on the JLPT level"""
-        level_info = self.jlpt_levels.get(jlpt_level, self.jlpt_levels["N4"])
+    def _cache_get(self, key: tuple) -> Optional[List[Dict[str, Any]]]:
+        """Return a fresh copy of cached questions for key, or None on a miss"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        self._cache.move_to_end(key)
+        return pickle.loads(entry)
+    
+    def _cache_put(self, key: tuple, questions: List[Dict[str, Any]]) -> None:
+        """Store questions under key, evicting the least recently used entry if full"""
+        # Store serialized so callers can't mutate the cached copy
+        self._cache[key] = pickle.dumps(questions, protocol=pickle.HIGHEST_PROTOCOL)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_maxsize:
+            self._cache.popitem(last=False)
+    
+    def _create_level_prompt(self, jlpt_level: str) -> str:
+        """Create the target-level line that ends each user message"""
+        return f"Target JLPT level: {jlpt_level} ({self.jlpt_levels[jlpt_level]['description']})"
+    
+    def _get_level_prompt(self, jlpt_level: str) -> str:
+        """Return the precomputed target-level line, defaulting to N4 for unknown levels"""
+        level_prompts = self._level_prompts
+        prompt = level_prompts.get(jlpt_level)
+        return prompt if prompt is not None else level_prompts["N4"]
+    
+    def _create_system_prompt(self) -> str:
+        """
+        Create the system prompt shared by all requests.
+        
+        The prompt covers every JLPT level and contains no per-request values, so it
+        forms a stable prefix that OpenAI's automatic prompt caching can reuse.
+        """
+        level_table = "\n".join(
+            f"""
+        JLPT {level} level characteristics:
+        - Vocabulary range: {info['vocab_range']}
+        - Kanji knowledge: {info['kanji']}
+        - Grammar complexity: {info['grammar']}
+        - {info['description']}"""
+            for level, info in self.jlpt_levels.items()
+        )
         
         return f"""
         You are an expert Japanese language teacher specializing in creating listening comprehension questions.
         
-        Your task is to generate questions appropriate for JLPT {jlpt_level} level students.
-        
-        JLPT {jlpt_level} level characteristics:
-        - Vocabulary range: {level_info['vocab_range']}
-        - Kanji knowledge: {level_info['kanji']}
-        - Grammar complexity: {level_info['grammar']}
-        - {level_info['description']}
+        Your task is to generate questions appropriate for the JLPT level given at the end of each request.
+        {level_table}
         
         Guidelines:
-        1. Make questions that accurately test listening comprehension at JLPT {jlpt_level} level
-        2. Use vocabulary and grammar appropriate for this level
+        1. Make questions that accurately test listening comprehension at the target JLPT level
+        2. Use vocabulary and grammar appropriate for the target level, as described above
         3. Create clear and unambiguous questions
         4. Ensure questions cover different aspects of comprehension: main idea, details, inference, etc.
         5. Make the incorrect options plausible but clearly incorrect
         6. Focus on natural Japanese usage that would appear in real conversations
         7. Include cultural context where relevant
         
-        Format your output as a valid JSON object with an array of question objects.
+        Format your output as a valid JSON object with an array of question objects, using this schema:
+        {{
+            "questions": [
+                {{
+                    "questionJapanese": "Question text in Japanese",
+                    "questionEnglish": "English translation of the question",
+                    "options": ["Option A", "Option B", "Option C", "Option D"],
+                    "correctAnswer": "The correct option text",
+                    "explanation": "Explanation of the answer in English"
+                }}
+            ]
+        }}
         """
     
     def _parse_response(self, response_text: str, include_answers: bool) -> List[Dict[str, Any]]:
         """Parse the API response to extract questions"""
         try:
             # Parse the JSON response
-            response_data = json.loads(response_text)
+            response_data = _json_loads(response_text)
             
             # Extract the questions
             if "questions" in response_data:
@@ -233,60 +761,51 @@ class QuestionGenerator:
             if not isinstance(questions, list):
                 questions = [questions]
             
-            # Process each question
-            processed_questions = []
-            for question in questions:
-                # Ensure all required fields are present
-                required_fields = ["questionJapanese", "questionEnglish", "options"]
-                for field in required_fields:
-                    if field not in question:
-                        # Try alternative field names
-                        alt_fields = {
-                            "questionJapanese": ["question_japanese", "japanese_question", "question"],
-                            "questionEnglish": ["question_english", "english_question", "translation"],
-                            "options": ["choices", "answers", "answer_choices"]
-                        }
-                        
-                        for alt in alt_fields.get(field, []):
-                            if alt in question:
-                                question[field] = question[alt]
-                                break
-                                
-                # Standardize option format
-                if "options" in question and isinstance(question["options"], list):
-                    # Ensure options are properly formatted
-                    formatted_options = []
-                    for i, option in enumerate(question["options"]):
-                        if isinstance(option, str):
-                            formatted_options.append({
-                                "text": option,
-                                "id": chr(65 + i)  # A, B, C, D...
-                            })
-                        elif isinstance(option, dict) and "text" in option:
-                            if "id" not in option:
-                                option["id"] = chr(65 + i)
-                            formatted_options.append(option)
-                    question["options"] = formatted_options
-                
-                # Handle correct answer
-                if "correctAnswer" not in question and "correct_answer" in question:
-                    question["correctAnswer"] = question["correct_answer"]
-                    
-                # Remove answer information if not requested
-                if not include_answers:
-                    question.pop("correctAnswer", None)
-                    question.pop("correct_answer", None)
-                    question.pop("explanation", None)
-                
-                processed_questions.append(question)
-                
-            return processed_questions
+            return [self._process_question(question, include_answers) for question in questions]
             
-        except json.JSONDecodeError as e:
+        except _JSONDecodeError as e:
             raise ValueError(f"Failed to parse JSON response: {str(e)}")
         except Exception as e:
             raise Exception(f"Error processing questions: {str(e)}")
 
+    def _process_question(self, question: Dict[str, Any], include_answers: bool) -> Dict[str, Any]:
+        """Normalize field names and option format of a single parsed question"""
+        # Ensure all required fields are present, trying alternative field names
+        for field, aliases in _FIELD_ALIASES.items():
+            if field not in question:
+                for alias in aliases:
+                    if alias in question:
+                        question[field] = question[alias]
+                        break
+                        
+        # Standardize option format
+        if "options" in question and isinstance(question["options"], list):
+            # Ensure options are properly formatted
+            formatted_options = []
+            for i, option in enumerate(question["options"]):
+                if isinstance(option, str):
+                    formatted_options.append({
+                        "text": option,
+                        "id": _OPTION_IDS[i]
+                    })
+                elif isinstance(option, dict) and "text" in option:
+                    if "id" not in option:
+                        option["id"] = _OPTION_IDS[i]
+                    formatted_options.append(option)
+            question["options"] = formatted_options
+        
+        # Handle correct answer
+        if "correctAnswer" not in question and "correct_answer" in question:
+            question["correctAnswer"] = question["correct_answer"]
+            
+        # Remove answer information if not requested
+        if not include_answers:
+            question.pop("correctAnswer", None)
+            question.pop("correct_answer", None)
+            question.pop("explanation", None)
+        
+        return question
+
     def _get_fallback_questions(self, jlpt_level: str, num_questions: int) -> List[Dict[str, Any]]:
         """Return pre-generated questions when API fails"""
         fallback_questions = {
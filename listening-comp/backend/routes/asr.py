@@ -3,6 +3,8 @@ from fastapi.responses import JSONResponse
 from typing import Dict, Any, Optional
 import tempfile
 import os
+import shutil
+import asyncio
 import logging
 from ..utils.asr import transcribe_audio
 from ..utils.pronunciation import analyze_pronunciation_accuracy
@@ -10,6 +12,27 @@ from ..utils.pronunciation import analyze_pronunciation_accuracy
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def _copy_to_temp_file(source, suffix: str) -> str:
+    """Copy a file object into a new temporary file and return its path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        try:
+            shutil.copyfileobj(source, temp_file, UPLOAD_CHUNK_SIZE)
+        except Exception:
+            temp_file.close()
+            os.unlink(temp_file.name)
+            raise
+        return temp_file.name
+
+async def _save_upload(audio: UploadFile, suffix: str = '.wav') -> str:
+    """
+    Copy an upload's spooled file straight to a temporary file, off the
+    event loop, and return its path
+    """
+    await audio.seek(0)
+    return await asyncio.to_thread(_copy_to_temp_file, audio.file, suffix)
+
 @router.post("/api/asr", response_model=Dict[str, Any])
 async def speech_to_text(audio: UploadFile = File(...)):
     """
@@ -17,10 +40,7 @@ async def speech_to_text(audio: UploadFile = File(...)):
     """
     try:
         # Save the uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            content = await audio.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
+        temp_path = await _save_upload(audio)
         
         # Process the audio file
         result = transcribe_audio(temp_path)
@@ -48,10 +68,7 @@ async def check_pronunciation(
     """
     try:
         # Save the uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            content = await audio.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
+        temp_path = await _save_upload(audio)
         
         # Process the audio and analyze pronunciation
         result = analyze_pronunciation_accuracy(temp_path, expected_text)
@@ -1,20 +1,36 @@
 import os
+import sys
 import uvicorn
 from fastapi import FastAPI, HTTPException, Query, File, UploadFile, Form, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from dotenv import load_dotenv
+from typing import List, Optional, Dict, Any, Literal
+import json
 import re
 import logging
+import asyncio
+import shutil
+import tempfile
 
-# Load environment variables from .env file
-load_dotenv()
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+    
+    def _ndjson_line(obj: Any) -> bytes:
+        return orjson.dumps(obj) + b"\n"
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+    
+    def _ndjson_line(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
 
+# Environment variables are read directly; services fall back to .env only when
+# a required variable is missing
 # Import our service modules
 from transcript_fetcher import YouTubeTranscriptFetcher
 from vector_db import VectorDatabase
-from question_generator import QuestionGenerator
+from question_generator import QuestionGenerator, JLPT_LEVELS
 from tts_service import TTSService
 from speech_recognition import SpeechRecognizer
 
@@ -23,7 +39,10 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
-app = FastAPI(title="Japanese Listening Comprehension Backend API")
+app = FastAPI(
+    title="Japanese Listening Comprehension Backend API",
+    default_response_class=DefaultResponse
+)
 
 # Configure CORS
 app.add_middleware(
@@ -41,6 +60,12 @@ question_generator = QuestionGenerator()
 tts_service = TTSService()
 speech_recognizer = SpeechRecognizer()
 
+@app.on_event("shutdown")
+async def shutdown_services():
+    """Release shared network clients and background workers"""
+    await question_generator.close()
+    await speech_recognizer.close()
+
 # Define API models
 class TranscriptRequest(BaseModel):
     video_id: str
@@ -52,7 +77,7 @@ class TranscriptAnalysisRequest(BaseModel):
 
 class QuestionGenerationRequest(BaseModel):
     transcript: str
-    jlpt_level: str = "N4"  # Default to intermediate level
+    jlpt_level: Literal["N1", "N2", "N3", "N4", "N5"] = "N4"  # Default to intermediate level
     num_questions: int = 5
     include_answers: bool = True
 
@@ -69,15 +94,16 @@ class ASRRequest(BaseModel):
 def read_root():
     return {"status": "active", "service": "Japanese Listening Comprehension Backend"}
 
+# YouTube video ID patterns, compiled once at import
+_VIDEO_ID_PATTERNS = [
+    re.compile(r'(?:v=|\/)([0-9A-Za-z_-]{11}).*'),
+    re.compile(r'youtu.be\/([0-9A-Za-z_-]{11})')
+]
+
 def extract_video_id(url_or_id: str) -> str:
     """Extract video ID from URL or return as-is if already an ID"""
-    patterns = [
-        r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-        r'youtu.be\/([0-9A-Za-z_-]{11})'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url_or_id)
+    for pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url_or_id)
         if match:
             return match.group(1)
     return url_or_id
@@ -119,13 +145,6 @@ async def generate_questions(request: QuestionGenerationRequest):
                 status_code=422,
                 detail="Invalid transcript format. Expected a string."
             )
-            
-        if request.jlpt_level not in ["N1", "N2", "N3", "N4", "N5"]:
-            logger.error(f"Invalid JLPT level: {request.jlpt_level}")
-            raise HTTPException(
-                status_code=422,
-                detail="Invalid JLPT level. Must be one of: N1, N2, N3, N4, N5"
-            )
         
         # Clean the transcript text
         transcript_text = request.transcript.strip()
@@ -168,9 +187,33 @@ async def generate_questions(request: QuestionGenerationRequest):
             "source": "fallback"
         }
 
+@app.post("/api/questions/generate/stream")
+async def generate_questions_stream(request: QuestionGenerationRequest):
+    """Generate questions based on transcript, streamed as newline-delimited JSON"""
+    transcript_text = request.transcript.strip()
+    if not transcript_text:
+        raise HTTPException(status_code=422, detail="Empty transcript")
+    
+    async def question_lines():
+        async for question in question_generator.generate_stream(
+            transcript=transcript_text,
+            jlpt_level=request.jlpt_level,
+            num_questions=request.num_questions,
+            include_answers=request.include_answers
+        ):
+            yield _ndjson_line(question)
+    
+    return StreamingResponse(question_lines(), media_type="application/x-ndjson")
+
 @app.get("/api/questions")
 async def get_questions(jlpt_level: str = Query("N4", description="JLPT level (N1-N5)")):
     """Get questions filtered by JLPT level"""
+    if jlpt_level not in JLPT_LEVELS:
+        raise HTTPException(
+            status_code=422,
+            detail="Invalid JLPT level. Must be one of: N1, N2, N3, N4, N5"
+        )
+    
     try:
         questions = await question_generator.get_by_jlpt_level(jlpt_level)
         return {"status": "success", "questions": questions}
@@ -197,25 +240,39 @@ async def get_voices():
         raise HTTPException(status_code=500, detail=f"Failed to retrieve voices: {str(e)}")
 
 # Speech Recognition
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 @app.post("/api/asr")
 async def speech_recognition(file: UploadFile = File(...)):
     """Process speech audio and return recognized text"""
     try:
-        # Save uploaded file temporarily
-        temp_file_path = f"temp_{file.filename}"
-        with open(temp_file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Process with speech recognizer
-        transcription = await speech_recognizer.transcribe(temp_file_path)
-        
-        # Remove temporary file
-        os.remove(temp_file_path)
+        # Copy the upload's spooled file to a temporary file, keeping only the
+        # extension of the client-supplied filename
+        suffix = os.path.splitext(os.path.basename(file.filename or ""))[1]
+        fd, temp_file_path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as buffer:
+                await asyncio.to_thread(shutil.copyfileobj, file.file, buffer, UPLOAD_CHUNK_SIZE)
+            
+            # Process with speech recognizer
+            transcription = await speech_recognizer.transcribe(temp_file_path)
+        finally:
+            # Remove temporary file
+            os.remove(temp_file_path)
         
         return {"status": "success", "transcription": transcription}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Speech recognition failed: {str(e)}")
 
 if __name__ == "__main__":
-    uvicorn.run("run_backend:app", host="0.0.0.0", port=8000, reload=True)
+    # Hot reload is opt-in (DEV=1); otherwise serve with uvloop + httptools workers
+    dev_mode = os.getenv("DEV", "0") == "1"
+    uvicorn.run(
+        "run_backend:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=dev_mode,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",  # uvloop has no Windows support
+        http="httptools",
+        workers=None if dev_mode else int(os.getenv("WORKERS", "1"))
+    )
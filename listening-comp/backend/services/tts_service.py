@@ -3,30 +3,261 @@ Text-to-Speech (TTS) service for Japanese language learning.
 Provides high-quality Japanese speech synthesis with configurable parameters
 optimized for language learning.
 """
+import asyncio
 import os
+import re
 import tempfile
-import uuid
+import threading
 import json
+import hashlib
+import io
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
+from functools import lru_cache, wraps
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Literal, Tuple
+from xml.sax.saxutils import escape
 
 # AWS Polly
 import boto3
+from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
 
 # Google TTS
 from google.cloud import texttospeech
 from google.oauth2 import service_account
 
+# Compressed SSML sidecars for the synthesis cache (gzip fallback)
+try:
+    import zstandard
+    _SIDECAR_SUFFIX = '.ssml.zst'
+    _compress_sidecar = zstandard.ZstdCompressor(level=3).compress
+except ImportError:
+    import gzip
+    _SIDECAR_SUFFIX = '.ssml.gz'
+    _compress_sidecar = gzip.compress
+
+# Aho-Corasick automaton for dialect substitution (regex fallback)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Audio processing
 import soundfile as sf
 import numpy as np
-from pydub import AudioSegment
 
-# Load environment variables
+# Load environment variables once per process, from backend/.env when present
+# (an explicit path skips find_dotenv's directory walk)
 from dotenv import load_dotenv
-load_dotenv()
+_ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+if not os.environ.get("_TTS_ENV_LOADED"):
+    load_dotenv(_ENV_FILE if _ENV_FILE.exists() else None, override=False)
+    os.environ["_TTS_ENV_LOADED"] = "1"
+
+# Number of synthesized clips kept in memory; the disk tier under output_dir/cache is unbounded
+_MEM_CACHE_SIZE = 256
+
+# In-memory synthesis cache shared by all service instances (the API creates
+# one per request) and by the worker threads of chunked/async synthesis
+_MEM_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_MEM_CACHE_LOCK = threading.Lock()
+
+# Sample rate requested for WAV output (Polly PCM supports 8000 or 16000 Hz)
+_PCM_SAMPLE_RATE = 16000
+
+# Buffer size for audio file writes (one write call for typical clips)
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Plain text longer than this is split at sentence ends and synthesized concurrently
+_CHUNK_CHARS = 1000
+_CHUNK_WORKERS = 8
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[。！？])')
+
+# Keep Polly connections alive between bursts and allow concurrent synthesis
+_POLLY_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    connect_timeout=3,
+    read_timeout=15,
+    retries={'mode': 'adaptive', 'max_attempts': 5}
+)
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write bytes to a temp file next to path, then rename it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb', buffering=_WRITE_BUFFER_SIZE) as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# Extra entities escaped in SSML (escape() already handles &, < and >)
+_SSML_ENTITIES = {'"': '&quot;', "'": '&apos;'}
+
+def _escape_ssml(text: str) -> str:
+    """Escape plain text for embedding in SSML; text that is already SSML is returned unchanged."""
+    if text.startswith('<speak>'):
+        return text
+    return escape(text, _SSML_ENTITIES)
+
+# Speaking rate per JLPT level
+_JLPT_RATES = {
+    "N5": 0.75,  # Slowest for beginners
+    "N4": 0.85,
+    "N3": 0.95,
+    "N2": 1.0,
+    "N1": 1.05   # Native speed for advanced
+}
+
+# Pauses inserted after punctuation for beginner levels
+_PUNCT_BREAKS = {
+    "。": "。<break time='500ms'/>",
+    "、": "、<break time='300ms'/>",
+    "！": "！<break time='500ms'/>",
+    "？": "？<break time='500ms'/>"
+}
+_PAUSE_RE = re.compile("[。、！？]")
+
+# SSML used to mark high (H) and low (L) morae in emphasize_pitch_accent
+_PITCH_TAGS = {
+    'H': '<prosody pitch="+2st">{}</prosody>',
+    'L': '<prosody pitch="-2st">{}</prosody>'
+}
+
+# Provider clients shared by all service instances (created on first use)
+_POLLY_CLIENT = None
+_GOOGLE_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+def _get_polly_client():
+    """Return the shared AWS Polly client, creating it on first call."""
+    global _POLLY_CLIENT
+    if _POLLY_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _POLLY_CLIENT is None:
+                region = os.environ.get("AWS_REGION", "us-east-1")
+                _POLLY_CLIENT = boto3.client('polly', region_name=region, config=_POLLY_CONFIG)
+    return _POLLY_CLIENT
+
+def _get_google_client():
+    """Return the shared Google TTS client, creating it on first call."""
+    global _GOOGLE_CLIENT
+    if _GOOGLE_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _GOOGLE_CLIENT is None:
+                _GOOGLE_CLIENT = texttospeech.TextToSpeechClient()
+    return _GOOGLE_CLIENT
+
+@lru_cache(maxsize=128)
+def _google_voice_params(voice_id: str) -> "texttospeech.VoiceSelectionParams":
+    """Google voice selection for a Japanese voice name, built once per voice."""
+    return texttospeech.VoiceSelectionParams(language_code='ja-JP', name=voice_id)
+
+@lru_cache(maxsize=256)
+def _google_audio_config(speaking_rate: float, pitch: float, output_format: str) -> "texttospeech.AudioConfig":
+    """Google audio config for rate/pitch rounded to 0.01, built once per combination."""
+    return texttospeech.AudioConfig(
+        audio_encoding=(texttospeech.AudioEncoding.LINEAR16 if output_format == 'wav'
+                        else texttospeech.AudioEncoding.MP3),
+        speaking_rate=speaking_rate,
+        pitch=pitch
+    )
+
+def _pcm_to_wav(pcm: bytes, sample_rate: int = _PCM_SAMPLE_RATE) -> bytes:
+    """Wrap raw 16-bit mono PCM in a WAV container using soundfile."""
+    buffer = io.BytesIO()
+    sf.write(buffer, np.frombuffer(pcm, dtype=np.int16), sample_rate, format='WAV', subtype='PCM_16')
+    return buffer.getvalue()
+
+def _mp3_concat(chunks: List[bytes]) -> bytes:
+    """
+    Join MP3 clips at the frame level without decoding.
+    
+    ID3v2 headers and ID3v1 trailers are stripped from every clip so only MPEG
+    frames remain. Only valid when all clips share bitrate and sample rate,
+    which holds for chunks synthesized with the same voice and settings.
+    
+    Args:
+        chunks: MP3 clips in playback order
+    
+    Returns:
+        Concatenated MP3 bytes
+    """
+    out = bytearray()
+    for chunk in chunks:
+        start, end = 0, len(chunk)
+        if chunk[:3] == b'ID3' and len(chunk) >= 10:
+            # Tag size is a 28-bit synchsafe integer; a footer adds another 10 bytes
+            size = ((chunk[6] & 0x7f) << 21) | ((chunk[7] & 0x7f) << 14) | ((chunk[8] & 0x7f) << 7) | (chunk[9] & 0x7f)
+            start = 10 + size + (10 if chunk[5] & 0x10 else 0)
+        if end - start >= 128 and chunk[end - 128:end - 125] == b'TAG':
+            end -= 128
+        out += chunk[start:end]
+    return bytes(out)
+
+def _mem_cache_get(key: str) -> Optional[bytes]:
+    """Return cached audio for key (marking it most recently used), or None."""
+    with _MEM_CACHE_LOCK:
+        audio_content = _MEM_CACHE.get(key)
+        if audio_content is not None:
+            _MEM_CACHE.move_to_end(key)
+        return audio_content
+
+def _mem_cache_put(key: str, audio_content: bytes) -> None:
+    """Store audio in the in-memory LRU, evicting the oldest entry when full."""
+    with _MEM_CACHE_LOCK:
+        _MEM_CACHE[key] = audio_content
+        _MEM_CACHE.move_to_end(key)
+        if len(_MEM_CACHE) > _MEM_CACHE_SIZE:
+            _MEM_CACHE.popitem(last=False)
+
+def cached_synth(provider: str):
+    """
+    Add a two-tier (memory LRU + audio file on disk) cache to a provider synthesis method.
+    
+    Identical requests are served without calling the provider API. The wrapped
+    method only returns the audio bytes; the wrapper writes them under
+    {output_dir}/cache, named by the request hash (see _cache_path), and
+    returns that file as the path. The input text is stored beside it as a
+    compressed .ssml.zst (or .ssml.gz) sidecar.
+    
+    Args:
+        provider: Provider name mixed into the cache key
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, text: str, save_to_file: bool = True, **kwargs) -> Tuple[str, bytes]:
+            key = self._cache_key(provider=provider, text=text, **kwargs)
+            cache_path = self._cache_path(key, kwargs.get('output_format', 'mp3'))
+            
+            # Memory tier, then disk tier
+            audio_content = _mem_cache_get(key)
+            if audio_content is not None:
+                if save_to_file and not os.path.exists(cache_path):
+                    _write_atomic(cache_path, audio_content)
+            elif os.path.exists(cache_path):
+                with open(cache_path, 'rb') as file:
+                    audio_content = file.read()
+                _mem_cache_put(key, audio_content)
+            else:
+                audio_content = func(self, text, **kwargs)
+                if not audio_content:
+                    return "", audio_content
+                _write_atomic(cache_path, audio_content)
+                # Keep the synthesized input next to the audio for inspection
+                _write_atomic(os.path.splitext(cache_path)[0] + _SIDECAR_SUFFIX,
+                              _compress_sidecar(text.encode('utf-8')))
+                _mem_cache_put(key, audio_content)
+            
+            return (cache_path if save_to_file else ""), audio_content
+        return wrapper
+    return decorator
 
 class VoiceGender(str, Enum):
     """Voice gender options."""
@@ -54,12 +285,87 @@ class TTSProvider(str, Enum):
     AWS_POLLY = "aws_polly"
     GOOGLE_TTS = "google_tts"
 
+# Dialect substitutions per regional accent, compiled to one alternation each
+_ACCENT_REPLACEMENTS = {
+    RegionalAccent.KANSAI: {
+        'です': 'どす',
+        'ます': 'まんねん',
+        'ください': 'くださいな',
+        'なければ': 'なあかん',
+    },
+    RegionalAccent.TOHOKU: {
+        # Tohoku dialect characteristics
+        'です': 'でがす',
+        'ます': 'まず',
+        'ない': 'ねぇ',
+    },
+    RegionalAccent.KYUSHU: {
+        # Kyushu dialect characteristics
+        'です': 'ばい',
+        'ます': 'もす',
+        'ください': 'くれんね',
+    }
+}
+
+_ACCENT_PATTERNS = {
+    accent: (re.compile('|'.join(map(re.escape, sorted(mapping, key=len, reverse=True)))), mapping)
+    for accent, mapping in _ACCENT_REPLACEMENTS.items()
+}
+
+def _build_automaton(mapping: Dict[str, str]):
+    """Build an Aho-Corasick automaton whose values are (key, replacement) pairs."""
+    automaton = ahocorasick.Automaton()
+    for key, value in mapping.items():
+        automaton.add_word(key, (key, value))
+    automaton.make_automaton()
+    return automaton
+
+def _replace_with_automaton(automaton, text: str) -> str:
+    """Replace leftmost-longest, non-overlapping automaton matches in one scan."""
+    parts = []
+    pos = 0
+    for end, (key, value) in automaton.iter_long(text):
+        start = end - len(key) + 1
+        parts.append(text[pos:start])
+        parts.append(value)
+        pos = end + 1
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+_ACCENT_AUTOMATA = (
+    {accent: _build_automaton(mapping) for accent, mapping in _ACCENT_REPLACEMENTS.items()}
+    if AHOCORASICK_AVAILABLE else {}
+)
+
+# Accent-specific prosody, stored as prebuilt opening tags
+_ACCENT_PROSODY = {
+    RegionalAccent.KANSAI: '<prosody rate="1.1" pitch="+2st">',   # Slightly faster, higher pitch
+    RegionalAccent.TOHOKU: '<prosody rate="0.95" pitch="-1st">',  # Slower, lower pitch
+    RegionalAccent.KYUSHU: '<prosody rate="1.05" pitch="+1st">'   # Moderate adjustments
+}
+
+@lru_cache(maxsize=256)
+def _prosody_open(rate: int, pitch: float, volume: float) -> str:
+    """Opening <speak><prosody> tag for a rate percentage and pitch/volume rounded to 0.1."""
+    return f'<speak><prosody rate="{rate}%" pitch="{pitch:+.1f}st" volume="{volume:+.1f}dB">'
+
+@lru_cache(maxsize=64)
+def _volume_open(volume: float) -> str:
+    """Opening <speak><prosody> tag for a volume adjustment rounded to 0.1 dB."""
+    return f'<speak><prosody volume="{volume:+.1f}dB">'
+
 class JapaneseTTSService:
     """
     Japanese Text-to-Speech service with features optimized for language learning.
     Supports multiple providers, voice types, and configurable parameters.
     """
     
+    # Fixed attribute set: no per-instance __dict__
+    __slots__ = (
+        'provider', 'output_dir', 'polly_client', 'google_client',
+        '_cache_dir', '_aws_voice_catalog', '_google_voice_catalog'
+    )
+    
     def __init__(self, 
                  provider: TTSProvider = TTSProvider.AWS_POLLY,
                  output_dir: Optional[str] = None):
@@ -76,19 +382,22 @@ class JapaneseTTSService:
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Synthesis cache: the shared in-memory LRU is backed by audio files on disk
+        self._cache_dir = os.path.join(self.output_dir, "cache")
+        os.makedirs(self._cache_dir, exist_ok=True)
+        
         # Initialize providers
         self._init_aws_polly()
         self._init_google_tts()
         
-        # Cache available voices
-        self._aws_voices = self._get_aws_voices()
-        self._google_voices = self._get_google_voices()
+        # Voice catalogs are fetched lazily on first access (see _aws_voices/_google_voices)
+        self._aws_voice_catalog: Optional[Dict[str, Dict[str, Any]]] = None
+        self._google_voice_catalog: Optional[Dict[str, Dict[str, Any]]] = None
     
     def _init_aws_polly(self):
         """Initialize AWS Polly client."""
         try:
-            region = os.environ.get("AWS_REGION", "us-east-1")
-            self.polly_client = boto3.client('polly', region_name=region)
+            self.polly_client = _get_polly_client()
         except Exception as e:
             self.polly_client = None
             print(f"Warning: AWS Polly initialization failed: {e}")
@@ -98,7 +407,7 @@ class JapaneseTTSService:
         try:
             creds_path = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
             if creds_path and os.path.exists(creds_path):
-                self.google_client = texttospeech.TextToSpeechClient()
+                self.google_client = _get_google_client()
             else:
                 self.google_client = None
                 print("Warning: Google TTS credentials not found")
@@ -106,7 +415,21 @@ class JapaneseTTSService:
             self.google_client = None
             print(f"Warning: Google TTS initialization failed: {e}")
     
-    def _get_aws_voices(self) -> Dict[str, Dict[str, Any]]:
+    @property
+    def _aws_voices(self) -> Dict[str, Dict[str, Any]]:
+        """AWS Polly voice catalog, fetched on first access."""
+        if self._aws_voice_catalog is None:
+            self._aws_voice_catalog = self._fetch_aws_voices()
+        return self._aws_voice_catalog
+    
+    @property
+    def _google_voices(self) -> Dict[str, Dict[str, Any]]:
+        """Google TTS voice catalog, fetched on first access."""
+        if self._google_voice_catalog is None:
+            self._google_voice_catalog = self._fetch_google_voices()
+        return self._google_voice_catalog
+    
+    def _fetch_aws_voices(self) -> Dict[str, Dict[str, Any]]:
         """
         Get available AWS Polly Japanese voices with their properties.
         
@@ -163,7 +486,7 @@ class JapaneseTTSService:
             
         return voices
 
-    def _get_google_voices(self) -> Dict[str, Dict[str, Any]]:
+    def _fetch_google_voices(self) -> Dict[str, Dict[str, Any]]:
         """Get available Google TTS Japanese voices with their properties."""
         if not self.google_client:
             return {}
@@ -205,6 +528,14 @@ class JapaneseTTSService:
             List of voice information dictionaries with provider, id, gender, etc.
         """
         voices = []
+        
+        # Fetch both catalogs concurrently if neither has been loaded yet
+        if self._aws_voice_catalog is None and self._google_voice_catalog is None:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                aws_future = executor.submit(self._fetch_aws_voices)
+                google_future = executor.submit(self._fetch_google_voices)
+                self._aws_voice_catalog = aws_future.result()
+                self._google_voice_catalog = google_future.result()
             
         # AWS Polly voices
         for voice_id, properties in self._aws_voices.items():
@@ -243,45 +574,23 @@ class JapaneseTTSService:
         """
         if accent == RegionalAccent.STANDARD:
             return text
-            
-        # Define accent-specific modifications
-        accent_patterns = {
-            RegionalAccent.KANSAI: {
-                'です': 'どす',
-                'ます': 'まんねん',
-                'ください': 'くださいな',
-                'なければ': 'なあかん',
-            },
-            RegionalAccent.TOHOKU: {
-                # Tohoku dialect characteristics
-                'です': 'でがす',
-                'ます': 'まず',
-                'ない': 'ねぇ',
-            },
-            RegionalAccent.KYUSHU: {
-                # Kyushu dialect characteristics
-                'です': 'ばい',
-                'ます': 'もす',
-                'ください': 'くれんね',
-            }
-        }
         
-        # Apply accent-specific patterns
-        modified_text = text
-        if accent in accent_patterns:
-            for standard, dialectal in accent_patterns[accent].items():
-                modified_text = modified_text.replace(standard, dialectal)
+        # Escape plain text; unwrap existing SSML so the result has a single <speak> root
+        if text.startswith('<speak>') and text.endswith('</speak>'):
+            modified_text = text[len('<speak>'):-len('</speak>')]
+        else:
+            modified_text = _escape_ssml(text)
+            
+        # Apply accent-specific patterns in a single pass
+        if accent in _ACCENT_AUTOMATA:
+            modified_text = _replace_with_automaton(_ACCENT_AUTOMATA[accent], modified_text)
+        elif accent in _ACCENT_PATTERNS:
+            pattern, mapping = _ACCENT_PATTERNS[accent]
+            modified_text = pattern.sub(lambda match: mapping[match.group(0)], modified_text)
         
         # Add accent-specific prosody
-        prosody_params = {
-            RegionalAccent.KANSAI: {'rate': '1.1', 'pitch': '+2st'},  # Slightly faster, higher pitch
-            RegionalAccent.TOHOKU: {'rate': '0.95', 'pitch': '-1st'},  # Slower, lower pitch
-            RegionalAccent.KYUSHU: {'rate': '1.05', 'pitch': '+1st'}   # Moderate adjustments
-        }
-        
-        if accent in prosody_params:
-            params = prosody_params[accent]
-            modified_text = f'<prosody rate="{params["rate"]}" pitch="{params["pitch"]}">{modified_text}</prosody>'
+        if accent in _ACCENT_PROSODY:
+            modified_text = f'{_ACCENT_PROSODY[accent]}{modified_text}</prosody>'
         
         return f'<speak>{modified_text}</speak>'
 
@@ -295,50 +604,190 @@ class JapaneseTTSService:
                          accent: RegionalAccent = RegionalAccent.STANDARD,
                          speaking_style: SpeakingStyle = SpeakingStyle.POLITE,
                          emphasize_pitch_accent: bool = False,
-                         save_to_file: bool = True) -> Tuple[str, bytes]:
-        """Enhanced synthesize_speech with regional accent support."""
+                         save_to_file: bool = True,
+                         output_format: Literal['mp3', 'wav'] = 'mp3') -> Tuple[str, bytes]:
+        """Enhanced synthesize_speech with regional accent support.
+        
+        output_format='wav' returns 16-bit PCM WAV, which avoids a lossy MP3
+        decode for audio fed into ASR or further signal processing.
+        """
+        
+        # Text may already be SSML (e.g. from optimize_for_learner_level)
+        ssml = text.startswith('<speak>')
         
         # Apply regional accent if specified
         if accent != RegionalAccent.STANDARD:
             text = self._apply_regional_accent(text, accent)
             ssml = True
-        else:
-            ssml = False
         
         provider = provider or self.provider
         
         if provider == TTSProvider.AWS_POLLY:
-            return self._synthesize_aws_polly(
-                text=text,
-                voice_id=voice_id,
-                speaking_rate=speaking_rate,
-                pitch=pitch,
-                volume=volume,
-                save_to_file=save_to_file,
-                ssml=ssml
-            )
+            synthesize = self._synthesize_aws_polly
         elif provider == TTSProvider.GOOGLE_TTS:
-            return self._synthesize_google_tts(
-                text=text,
-                voice_id=voice_id,
-                speaking_rate=speaking_rate,
-                pitch=pitch,
-                volume=volume,
-                save_to_file=save_to_file,
-                ssml=ssml
-            )
+            synthesize = self._synthesize_google_tts
         else:
             raise ValueError(f"Unsupported provider: {provider}")
+        
+        params = {
+            'voice_id': voice_id,
+            'speaking_rate': speaking_rate,
+            'pitch': pitch,
+            'volume': volume,
+            'ssml': ssml,
+            'output_format': output_format
+        }
+        
+        # Long plain text is split into sentence-aligned chunks synthesized in parallel
+        # (MP3 only: WAV chunks carry their own headers and cannot be joined byte-wise;
+        # SSML is never split, since a cut would break its markup)
+        if not ssml and output_format == 'mp3' and len(text) > _CHUNK_CHARS:
+            return self._synthesize_chunked(synthesize, provider, text, save_to_file, **params)
+        
+        return synthesize(text=text, save_to_file=save_to_file, **params)
     
+    async def asynthesize_speech(self, text: str, **kwargs) -> Tuple[str, bytes]:
+        """
+        Async variant of synthesize_speech for use from request handlers.
+        
+        The blocking provider call runs in a worker thread, so a slow synthesis
+        does not stall the event loop and concurrent requests proceed in parallel.
+        
+        Args:
+            text: Japanese text to synthesize
+            **kwargs: Same keyword arguments as synthesize_speech
+        
+        Returns:
+            Tuple of (file path or "", audio bytes)
+        """
+        return await asyncio.to_thread(self.synthesize_speech, text, **kwargs)
+    
+    def _split_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks of at most _CHUNK_CHARS, breaking after 。！？ where possible.
+        
+        Args:
+            text: Plain Japanese text
+        
+        Returns:
+            List of text chunks in original order
+        """
+        chunks = []
+        current = ""
+        for sentence in _SENTENCE_SPLIT_RE.split(text):
+            if len(current) + len(sentence) <= _CHUNK_CHARS:
+                current += sentence
+                continue
+            if current:
+                chunks.append(current)
+            # Hard-split sentences that are longer than a chunk on their own
+            while len(sentence) > _CHUNK_CHARS:
+                chunks.append(sentence[:_CHUNK_CHARS])
+                sentence = sentence[_CHUNK_CHARS:]
+            current = sentence
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _synthesize_chunked(self, synthesize, provider: TTSProvider, text: str,
+                            save_to_file: bool = True, **params) -> Tuple[str, bytes]:
+        """
+        Synthesize long text as concurrent per-chunk requests and join the MP3 audio.
+        
+        Args:
+            synthesize: Provider synthesis method
+            provider: Provider used, for the cache key of the joined file
+            text: Plain Japanese text
+            save_to_file: Whether to write the joined audio to disk
+            **params: Voice and prosody parameters passed to each chunk
+        
+        Returns:
+            Tuple of (file path or "", joined audio bytes)
+        """
+        chunks = self._split_text(text)
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(_CHUNK_WORKERS, len(chunks))) as executor:
+            futures = {
+                executor.submit(synthesize, text=chunk, save_to_file=False, **params): index
+                for index, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()[1]
+        
+        # MP3 frames are self-contained, so same-voice chunks can be joined frame-wise
+        audio_content = _mp3_concat([results[index] for index in range(len(chunks))])
+        
+        file_path = ""
+        if save_to_file and audio_content:
+            key = self._cache_key(provider=provider.value, text=text, **params)
+            file_path = self._cache_path(key)
+            if not os.path.exists(file_path):
+                _write_atomic(file_path, audio_content)
+        return file_path, audio_content
+    
+    def _cache_key(self, **kwargs) -> str:
+        """
+        Build a SHA-256 cache key from canonicalized synthesis parameters.
+        
+        Floats are rounded to 3 decimals and text is stripped so that
+        equivalent requests map to the same key.
+        """
+        canonical = {}
+        for name, value in kwargs.items():
+            if isinstance(value, float):
+                value = round(value, 3)
+            elif name == 'text' and isinstance(value, str):
+                value = value.strip()
+            canonical[name] = value
+        payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _cache_path(self, key: str, output_format: str = 'mp3') -> str:
+        """Cache file named by the first 16 hex digits of the request key, so repeats share one file."""
+        return os.path.join(self._cache_dir, f"{key[:16]}.{output_format}")
+    
+    @cached_synth(TTSProvider.AWS_POLLY.value)
     def _synthesize_aws_polly(self, 
                              text: str,
                              voice_id: str = None,
                              speaking_rate: float = 1.0,
                              pitch: float = 0.0,
                              volume: float = 0.0,
-                             save_to_file: bool = True,
-                             ssml: bool = False) -> Tuple[str, bytes]:
+                             ssml: bool = False,
+                             output_format: str = 'mp3') -> bytes:
         """Synthesize speech using AWS Polly."""
+        kwargs = self._polly_request(text, voice_id, speaking_rate, pitch, volume, ssml)
+        if output_format == 'wav':
+            kwargs['OutputFormat'] = 'pcm'
+            kwargs['SampleRate'] = str(_PCM_SAMPLE_RATE)
+            
+        try:
+            # Call AWS Polly API
+            response = self.polly_client.synthesize_speech(**kwargs)
+            
+            # Get audio content (Polly returns headerless PCM for WAV requests)
+            audio_content = response.get('AudioStream').read()
+            if output_format == 'wav' and audio_content:
+                audio_content = _pcm_to_wav(audio_content)
+            
+            return audio_content
+            
+        except (BotoCoreError, ClientError) as error:
+            raise RuntimeError(f"AWS Polly synthesis failed: {error}")
+    
+    def _polly_request(self,
+                       text: str,
+                       voice_id: str = None,
+                       speaking_rate: float = 1.0,
+                       pitch: float = 0.0,
+                       volume: float = 0.0,
+                       ssml: bool = False) -> Dict[str, str]:
+        """
+        Build the common AWS Polly request parameters (MP3 output).
+        
+        Returns:
+            Keyword arguments for synthesize_speech / start_speech_synthesis_task
+        """
         if not self.polly_client:
             raise RuntimeError("AWS Polly client not initialized")
             
@@ -356,46 +805,92 @@ class JapaneseTTSService:
         # Apply SSML for pitch, rate and volume adjustments if needed
         if (speaking_rate != 1.0 or pitch != 0.0 or volume != 0.0) and not ssml:
             # Convert to SSML with prosody
-            ssml_text = f'<speak><prosody rate="{speaking_rate*100:.0f}%" pitch="{pitch:+.1f}st" volume="{volume:+.1f}dB">{text}</prosody></speak>'
+            prosody = _prosody_open(round(speaking_rate * 100), round(pitch, 1), round(volume, 1))
+            ssml_text = f'{prosody}{_escape_ssml(text)}</prosody></speak>'
             text = ssml_text
             ssml = True
             
+        return {
+            'Text': text,
+            'OutputFormat': 'mp3',
+            'VoiceId': voice_id,
+            'Engine': engine,
+            'LanguageCode': 'ja-JP',
+            'TextType': 'ssml' if ssml else 'text'
+        }
+    
+    def start_synthesis_task(self,
+                             text: str,
+                             voice_id: str = None,
+                             speaking_rate: float = 1.0,
+                             pitch: float = 0.0,
+                             volume: float = 0.0,
+                             ssml: bool = False,
+                             output_bucket: Optional[str] = None,
+                             output_prefix: str = "tts/") -> Tuple[str, str]:
+        """
+        Start an asynchronous AWS Polly synthesis task that writes MP3 to S3.
+        
+        Suited to long passages (beyond the synchronous 3000-character limit) and
+        batch generation: the call returns as soon as the task is scheduled.
+        
+        Args:
+            text: Japanese text or SSML to synthesize
+            voice_id: Polly voice ID (default: Mizuki)
+            speaking_rate: Speaking rate multiplier
+            pitch: Pitch adjustment in semitones
+            volume: Volume adjustment in dB
+            ssml: Whether text is already SSML
+            output_bucket: S3 bucket for the audio (default: POLLY_OUTPUT_BUCKET env var)
+            output_prefix: S3 key prefix for the audio
+        
+        Returns:
+            Tuple of (task ID, S3 output URI)
+        """
+        bucket = output_bucket or os.environ.get("POLLY_OUTPUT_BUCKET")
+        if not bucket:
+            raise ValueError("No S3 bucket given for Polly synthesis task (set POLLY_OUTPUT_BUCKET)")
+        
+        kwargs = self._polly_request(text, voice_id, speaking_rate, pitch, volume, ssml)
         try:
-            # Call AWS Polly API
-            kwargs = {
-                'Text': text,
-                'OutputFormat': 'mp3',
-                'VoiceId': voice_id,
-                'Engine': engine,
-                'LanguageCode': 'ja-JP',
-                'TextType': 'ssml' if ssml else 'text'
-            }
-            
-            response = self.polly_client.synthesize_speech(**kwargs)
-            
-            # Get audio content
-            audio_content = response.get('AudioStream').read()
-            
-            # Save to file if requested
-            file_path = ""
-            if save_to_file and audio_content:
-                file_path = os.path.join(self.output_dir, f"{uuid.uuid4()}.mp3")
-                with open(file_path, 'wb') as file:
-                    file.write(audio_content)
-                    
-            return file_path, audio_content
-            
+            response = self.polly_client.start_speech_synthesis_task(
+                OutputS3BucketName=bucket,
+                OutputS3KeyPrefix=output_prefix,
+                **kwargs
+            )
         except (BotoCoreError, ClientError) as error:
-            raise RuntimeError(f"AWS Polly synthesis failed: {error}")
+            raise RuntimeError(f"AWS Polly synthesis task failed to start: {error}")
+        
+        task = response['SynthesisTask']
+        return task['TaskId'], task.get('OutputUri', '')
+    
+    def get_synthesis_task(self, task_id: str) -> Dict[str, Any]:
+        """
+        Get the status of an AWS Polly synthesis task.
+        
+        Args:
+            task_id: ID returned by start_synthesis_task
+        
+        Returns:
+            Task description including TaskStatus (scheduled, inProgress, completed, failed) and OutputUri
+        """
+        if not self.polly_client:
+            raise RuntimeError("AWS Polly client not initialized")
+        try:
+            response = self.polly_client.get_speech_synthesis_task(TaskId=task_id)
+        except (BotoCoreError, ClientError) as error:
+            raise RuntimeError(f"AWS Polly synthesis task lookup failed: {error}")
+        return response['SynthesisTask']
     
+    @cached_synth(TTSProvider.GOOGLE_TTS.value)
     def _synthesize_google_tts(self,
                               text: str,
                               voice_id: str = None,
                               speaking_rate: float = 1.0,
                               pitch: float = 0.0,
                               volume: float = 0.0,
-                              save_to_file: bool = True,
-                              ssml: bool = False) -> Tuple[str, bytes]:
+                              ssml: bool = False,
+                              output_format: str = 'mp3') -> bytes:
         """Synthesize speech using Google TTS."""
         if not self.google_client:
             raise RuntimeError("Google TTS client not initialized")
@@ -413,7 +908,7 @@ class JapaneseTTSService:
         # Apply SSML for volume adjustment if needed (Google TTS supports rate and pitch directly)
         if volume != 0.0 and not ssml:
             # Convert to SSML with prosody for volume
-            ssml_text = f'<speak><prosody volume="{volume:+.1f}dB">{text}</prosody></speak>'
+            ssml_text = f'{_volume_open(round(volume, 1))}{_escape_ssml(text)}</prosody></speak>'
             text = ssml_text
             ssml = True
         
@@ -424,18 +919,9 @@ class JapaneseTTSService:
             else:
                 synthesis_input = texttospeech.SynthesisInput(text=text)
                 
-            # Configure voice
-            voice_params = texttospeech.VoiceSelectionParams(
-                language_code='ja-JP',
-                name=voice_id
-            )
-            
-            # Configure audio parameters
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=speaking_rate,
-                pitch=pitch
-            )
+            # Configure voice and audio parameters (memoized per voice / settings)
+            voice_params = _google_voice_params(voice_id)
+            audio_config = _google_audio_config(round(speaking_rate, 2), round(pitch, 2), output_format)
             
             # Call Google TTS API
             response = self.google_client.synthesize_speech(
@@ -444,17 +930,7 @@ class JapaneseTTSService:
                 audio_config=audio_config
             )
             
-            # Get audio content
-            audio_content = response.audio_content
-            
-            # Save to file if requested
-            file_path = ""
-            if save_to_file and audio_content:
-                file_path = os.path.join(self.output_dir, f"{uuid.uuid4()}.mp3")
-                with open(file_path, 'wb') as file:
-                    file.write(audio_content)
-                    
-            return file_path, audio_content
+            return response.audio_content
             
         except Exception as error:
             raise RuntimeError(f"Google TTS synthesis failed: {error}")
@@ -470,10 +946,11 @@ class JapaneseTTSService:
         Returns:
             SSML text with phoneme tags
         """
-        ssml_text = text
+        ssml_text = _escape_ssml(text)
         for kanji, reading in furigana_pairs:
             # Replace kanji with phoneme-annotated version
-            phoneme_tag = f'<phoneme alphabet="ipa" ph="{reading}">{kanji}</phoneme>'
+            kanji = escape(kanji, _SSML_ENTITIES)
+            phoneme_tag = f'<phoneme alphabet="ipa" ph="{escape(reading, _SSML_ENTITIES)}">{kanji}</phoneme>'
             ssml_text = ssml_text.replace(kanji, phoneme_tag)
             
         return f"<speak>{ssml_text}</speak>"
@@ -490,22 +967,14 @@ class JapaneseTTSService:
             Tuple of (modified text with pauses, speaking rate)
         """
         # Determine speaking rate based on JLPT level
-        rates = {
-            "N5": 0.75,  # Slowest for beginners
-            "N4": 0.85,
-            "N3": 0.95,
-            "N2": 1.0,
-            "N1": 1.05   # Native speed for advanced
-        }
-        rate = rates.get(jlpt_level, 1.0)
+        rate = _JLPT_RATES.get(jlpt_level, 1.0)
         
         # Only add pauses for beginner levels
         if jlpt_level in ["N5", "N4"]:
-            # Add pauses after punctuation marks for better comprehension
-            text = text.replace("。", "。<break time='500ms'/>")
-            text = text.replace("、", "、<break time='300ms'/>")
-            text = text.replace("！", "！<break time='500ms'/>")
-            text = text.replace("？", "？<break time='500ms'/>")
+            text = _escape_ssml(text)
+            
+            # Add pauses after punctuation marks for better comprehension (single pass)
+            text = _PAUSE_RE.sub(lambda match: _PUNCT_BREAKS[match.group(0)], text)
             
             # Wrap in SSML tags if not already
             if not text.startswith("<speak>"):
@@ -524,25 +993,23 @@ class JapaneseTTSService:
         Returns:
             SSML with pitch and emphasis adjustment
         """
-        ssml_text = text
+        # Build each word's emphasized form once, then replace all words in one pass
+        mapping = {}
         for word, pattern in accent_patterns:
             # Example pattern: "LHL" (low-high-low)
-            parts = []
-            for i, char in enumerate(word):
-                if i < len(pattern):
-                    if pattern[i] == "H":
-                        # High pitch
-                        parts.append(f'<prosody pitch="+2st">{char}</prosody>')
-                    elif pattern[i] == "L":
-                        # Low pitch
-                        parts.append(f'<prosody pitch="-2st">{char}</prosody>')
-                    else:
-                        parts.append(char)
-                else:
-                    parts.append(char)
-                    
-            emphasized = ''.join(parts)
-            ssml_text = ssml_text.replace(word, emphasized)
+            key = escape(word, _SSML_ENTITIES)
+            if key and key not in mapping:
+                mapping[key] = ''.join(
+                    _PITCH_TAGS[mark].format(escape(char, _SSML_ENTITIES)) if mark in _PITCH_TAGS
+                    else escape(char, _SSML_ENTITIES)
+                    for char, mark in zip(word, pattern.ljust(len(word)))
+                )
+        
+        text = _escape_ssml(text)
+        ssml_text = text
+        if mapping:
+            word_re = re.compile('|'.join(map(re.escape, sorted(mapping, key=len, reverse=True))))
+            ssml_text = word_re.sub(lambda match: mapping[match.group(0)], text)
             
         return f"<speak>{ssml_text}</speak>"
 
@@ -614,10 +1081,8 @@ def synthesize_speech(text, language="ja-JP"):
 
     # Try method 1: AWS Polly with standard engine
     try:
-        import boto3
-        
         logger.info("Attempting AWS Polly synthesis with standard engine")
-        polly_client = boto3.client('polly', region_name='us-east-1')
+        polly_client = _get_polly_client()
         response = polly_client.synthesize_speech(
             Text=text,
             OutputFormat='mp3',
@@ -635,10 +1100,8 @@ def synthesize_speech(text, language="ja-JP"):
     
     # Try method 2: Google TTS
     try:
-        from google.cloud import texttospeech
-        
         logger.info("Attempting Google TTS synthesis")
-        client = texttospeech.TextToSpeechClient()
+        client = _get_google_client()
         input_text = texttospeech.SynthesisInput(text=text)
         
         # Build the voice request
@@ -1,18 +1,80 @@
 import os
+import re
 import asyncio
-from typing import Dict, Any, Optional
 import logging
-from dotenv import load_dotenv
-import tempfile
 import subprocess
-import json
 import time
+import threading
 import base64
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, Any, Optional, Union, Tuple, List
 import numpy as np
 import openai
-from pydub import AudioSegment
-import whisper
+from dotenv import load_dotenv
+
+# CTranslate2-based Whisper with int8 weights (falls back to openai-whisper)
+try:
+    import ctranslate2
+    from faster_whisper import WhisperModel, BatchedInferencePipeline, decode_audio
+    from faster_whisper.audio import pad_or_trim
+    from faster_whisper.tokenizer import Tokenizer
+    from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+# SIMD content hashing for the transcription cache (falls back to BLAKE2b)
+try:
+    import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+# Silero VAD settings: only detected speech regions are sent to the Whisper encoder
+VAD_PARAMETERS = {"min_silence_duration_ms": 300}
+
+# Request coalescing: concurrent transcribe() calls arriving within
+# BATCH_WAIT seconds share one batched encoder/decoder run
+BATCH_WAIT = 0.05
+MAX_BATCH_REQUESTS = 16
+BATCH_SIZE = 16
+
+# Column layout for batched segments before they are split back per file
+SEGMENT_DTYPE = np.dtype([
+    ("start", "f8"),
+    ("end", "f8"),
+    ("avg_logprob", "f4"),
+    ("no_speech_prob", "f4"),
+    ("text", "O")
+])
+
+# openai-whisper models are shared through _load_model and their transcribe()
+# is not thread-safe (decoding mutates the model's kv-cache hooks), so decodes
+# run one at a time; audio loading still overlaps with them
+_WHISPER_DECODE_LOCK = threading.Lock()
+
+# Opt-in torch.compile (WHISPER_TORCH_COMPILE=1) for the openai-whisper fallback
+# on GPU; compiled kernels are cached on disk so later startups skip most of
+# the compile time
+TORCH_COMPILE_CACHE_DIR = os.getenv(
+    "TORCHINDUCTOR_CACHE_DIR", os.path.join(os.path.dirname(__file__), ".cache", "torchinductor")
+)
+
+# Transcriptions kept per recognizer, keyed by audio content hash
+TRANSCRIPTION_CACHE_SIZE = 256
+
+# Silent clip transcribed once at startup to prime kernels and caches
+WARMUP_SECONDS = 15
+WHISPER_SAMPLE_RATE = 16000
+
+# Whisper's fixed input window, used by the split encoder/decoder pipeline
+WINDOW_SAMPLES = 30 * WHISPER_SAMPLE_RATE
+
+# Legacy base64 audio payloads: only the base64 alphabet with correct padding,
+# and too long to be a mistyped file name
+_BASE64_AUDIO_RE = re.compile(r"(?:[A-Za-z0-9+/]{4}){16,}(?:[A-Za-z0-9+/]{2}==|[A-Za-z0-9+/]{3}=)?")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,62 +88,225 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 if openai_api_key:
     openai.api_key = openai_api_key
 
+def _faster_whisper_device() -> Tuple[str, str]:
+    """Pick (device, compute type): int8 weights on CPU, int8 with float16 activations on GPU."""
+    if ctranslate2.get_cuda_device_count() > 0:
+        return "cuda", "int8_float16"
+    return "cpu", "int8"
+
+def _torch_device() -> str:
+    """Pick the openai-whisper device: CUDA, then Apple MPS, then CPU."""
+    import torch
+    if torch.cuda.is_available():
+        return "cuda"
+    if torch.backends.mps.is_available():
+        return "mps"
+    return "cpu"
+
+@lru_cache(maxsize=4)
+def _load_model(model_name: str, device: Optional[str] = None, compute_type: Optional[str] = None):
+    """
+    Load a Whisper model once per process and configuration.
+    
+    Args:
+        model_name: Model size or local model path
+        device: Device to load onto (faster-whisper needs it; openai-whisper picks one if None)
+        compute_type: CTranslate2 compute type (faster-whisper only)
+        
+    Returns:
+        faster-whisper WhisperModel, or an openai-whisper model (int8 linear
+        layers when on CPU)
+    """
+    if FASTER_WHISPER_AVAILABLE:
+        return WhisperModel(
+            model_name,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=os.cpu_count() or 0
+        )
+    
+    # openai-whisper pulls in torch, so it is only imported when used
+    import whisper
+    model = whisper.load_model(model_name, device=device)
+    if model.device.type == "cpu":
+        # Dynamic int8 quantization of the linear layers. whisper's Linear
+        # subclass overrides forward(), which the quantized module would
+        # silently drop, so swap in plain nn.Linear layers first
+        import torch
+        _replace_whisper_linears(model)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif os.getenv("WHISPER_TORCH_COMPILE") == "1":
+        _compile_whisper(model)
+    return model
+
+def _replace_whisper_linears(module) -> None:
+    """
+    Replace whisper.model.Linear layers with nn.Linear sharing the same parameters.
+    
+    whisper's subclass only casts its weights to the input dtype, which is a
+    no-op for the float32 CPU models that get quantized.
+    """
+    import torch
+    from whisper.model import Linear as WhisperLinear
+    for name, child in module.named_children():
+        if isinstance(child, WhisperLinear):
+            linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None, device="meta")
+            linear.weight = child.weight
+            linear.bias = child.bias
+            setattr(module, name, linear)
+        else:
+            _replace_whisper_linears(child)
+
+def _whisper_transcribe(model, audio: np.ndarray, **options) -> Dict[str, Any]:
+    """Run openai-whisper's transcribe() while holding the process-wide decode lock."""
+    with _WHISPER_DECODE_LOCK:
+        return model.transcribe(audio, **options)
+
+def _compile_whisper(model) -> None:
+    """
+    Compile an openai-whisper model's encoder and decoder in place.
+    
+    The encoder always sees a padded 30-second mel, so it is compiled with
+    CUDA graphs; the decoder's token length grows while decoding, so it is
+    compiled for dynamic shapes.
+    """
+    os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", TORCH_COMPILE_CACHE_DIR)
+    import torch
+    import torch._inductor.config as inductor_config
+    if hasattr(inductor_config, "fx_graph_cache"):
+        inductor_config.fx_graph_cache = True
+    
+    model.encoder = torch.compile(model.encoder, mode="reduce-overhead")
+    model.decoder = torch.compile(model.decoder, dynamic=True)
+    logger.info(f"Compiled Whisper encoder/decoder (cache: {os.environ['TORCHINDUCTOR_CACHE_DIR']})")
+
+def _ffmpeg_decode(source: Union[str, bytes, bytearray, memoryview]) -> np.ndarray:
+    """
+    Decode audio of any format to 16 kHz mono samples.
+    
+    ffmpeg writes raw PCM to a pipe, so no intermediate WAV file is written
+    and re-read. In-memory audio is fed to ffmpeg on stdin.
+    
+    Args:
+        source: Path to an audio file, or the encoded audio bytes
+        
+    Returns:
+        Float32 samples in [-1, 1]
+    """
+    in_memory = not isinstance(source, str)
+    try:
+        proc = subprocess.run(
+            ["ffmpeg", *([] if in_memory else ["-nostdin"]), "-threads", "0",
+             "-i", "pipe:0" if in_memory else source,
+             "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(WHISPER_SAMPLE_RATE), "-"],
+            input=source if in_memory else None,
+            capture_output=True,
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error decoding audio: {e.stderr.decode(errors='ignore')}")
+        raise
+    
+    return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+
 class JapaneseSpeechRecognition:
     """Japanese-specific speech recognition using Whisper."""
     
-    def __init__(self, use_local_model: bool = False, model_size: str = "base"):
+    def __init__(self, use_local_model: bool = False, model_size: str = "base", warmup: bool = True):
         """
         Initialize speech recognition with Whisper model.
         
         Args:
             use_local_model: Whether to use a local model or download from Whisper
             model_size: Size of the Whisper model to use ("tiny", "base", "small", "medium", "large")
+            warmup: Transcribe a short silent clip in a background thread so the
+                first request doesn't pay the one-off initialization cost
         """
         self.model_size = model_size
         self.use_local_model = use_local_model
+        self.use_faster_whisper = FASTER_WHISPER_AVAILABLE
+        self.device = "cpu"
         
         # Initialize Whisper model
         try:
+            model_name = model_size
             if use_local_model:
+                # Local models are CTranslate2 directories for faster-whisper,
+                # .pt checkpoints for openai-whisper
                 model_path = os.path.join(os.path.dirname(__file__), "models", f"whisper-{model_size}")
                 if os.path.exists(model_path):
-                    self.model = whisper.load_model(model_path)
+                    model_name = model_path
                 else:
                     logger.warning(f"Local model not found at {model_path}. Downloading from Whisper...")
-                    self.model = whisper.load_model(model_size)
+            
+            if self.use_faster_whisper:
+                self.device, compute_type = _faster_whisper_device()
+                self.model = _load_model(model_name, self.device, compute_type)
             else:
-                self.model = whisper.load_model(model_size)
+                self.device = _torch_device()
+                try:
+                    self.model = _load_model(model_name, self.device)
+                except Exception as e:
+                    # Some Whisper/PyTorch combinations can't place the model on MPS
+                    if self.device != "mps":
+                        raise
+                    logger.warning(f"Could not load Whisper on MPS, using CPU: {str(e)}")
+                    self.device = "cpu"
+                    self.model = _load_model(model_name, self.device)
                 
-            logger.info(f"Initialized Whisper model ({model_size})")
+            logger.info(f"Initialized Whisper model ({model_size}) on {self.device}")
             
         except Exception as e:
             logger.error(f"Error initializing Whisper model: {str(e)}")
             raise
+        
+        if warmup:
+            threading.Thread(target=self.warmup, daemon=True).start()
     
-    def process_audio_data(self, audio_path: str) -> Dict[str, Any]:
+    def warmup(self) -> None:
+        """Transcribe one second of silence to prime the model."""
+        silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+        try:
+            if self.use_faster_whisper:
+                # Segments are generated lazily; consume them so decoding actually runs
+                segments, _ = self.model.transcribe(silence, language="ja", beam_size=1)
+                list(segments)
+            else:
+                _whisper_transcribe(self.model, silence, language="ja", fp16=self.device != "cpu")
+        except Exception as e:
+            logger.warning(f"Whisper warmup failed: {str(e)}")
+    
+    def process_audio_data(self, audio_path: Union[str, bytes, bytearray, memoryview]) -> Dict[str, Any]:
         """
         Process audio file and return transcription.
         
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path to the audio file, or the encoded audio itself as
+                raw bytes (preferred for uploads). Base64 strings are still
+                accepted for older callers.
             
         Returns:
             Dictionary containing transcription and metadata
         """
         try:
-            # Convert audio to WAV format if needed
-            audio_path = self._ensure_wav_format(audio_path)
+            # Decode any input format straight to 16 kHz mono samples
+            audio = self._load_audio(audio_path)
             
             # Transcribe audio with Japanese-specific settings
-            result = self.model.transcribe(
-                audio_path,
-                language="ja",  # Force Japanese language
-                task="transcribe",
-                initial_prompt="以下は日本語の音声です。",  # Hint that input is Japanese
-                word_timestamps=True,  # Get word-level timing
-                no_speech_threshold=0.5,
-                compression_ratio_threshold=2.4
-            )
+            if self.use_faster_whisper:
+                result = self._transcribe_faster_whisper(audio)
+            else:
+                result = _whisper_transcribe(
+                    self.model,
+                    audio,
+                    language="ja",  # Force Japanese language
+                    task="transcribe",
+                    initial_prompt="以下は日本語の音声です。",  # Hint that input is Japanese
+                    word_timestamps=True,  # Get word-level timing
+                    no_speech_threshold=0.5,
+                    compression_ratio_threshold=2.4,
+                    fp16=self.device != "cpu"  # Half precision on GPU/MPS
+                )
             
             # Process the result
             processed_result = {
@@ -100,107 +325,213 @@ class JapaneseSpeechRecognition:
                 "confidence": self._calculate_average_confidence(result)
             }
             
-            # Clean up temporary WAV file if it was created
-            if audio_path != audio_path and os.path.exists(audio_path):
-                os.remove(audio_path)
-            
             return processed_result
             
         except Exception as e:
             logger.error(f"Error processing audio: {str(e)}")
             raise
     
-    def _ensure_wav_format(self, audio_path: str) -> str:
+    def _transcribe_faster_whisper(self, audio: np.ndarray) -> Dict[str, Any]:
         """
-        Convert audio file to WAV format if needed.
+        Transcribe with faster-whisper and return openai-whisper's result shape.
+        
+        Segment confidence is the mean token probability, exp(avg_logprob).
         
         Args:
-            audio_path: Path to the input audio file
+            audio: 16 kHz mono float32 samples
             
         Returns:
-            Path to WAV file (either original or converted)
+            Dictionary with text, segments and language
         """
-        try:
-            # Check if file is already WAV
-            if audio_path.lower().endswith('.wav'):
-                return audio_path
-            
-            # Load audio file
-            audio = AudioSegment.from_file(audio_path)
-            
-            # Create temporary WAV file
-            temp_wav = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-            temp_wav_path = temp_wav.name
-            temp_wav.close()
-            
-            # Export as WAV
-            audio.export(temp_wav_path, format='wav')
+        segments_iter, info = self.model.transcribe(
+            audio,
+            language="ja",
+            task="transcribe",
+            initial_prompt="以下は日本語の音声です。",
+            word_timestamps=True,
+            no_speech_threshold=0.5,
+            compression_ratio_threshold=2.4,
+            vad_filter=True,
+            vad_parameters=VAD_PARAMETERS,
+            beam_size=5
+        )
+        segments = [
+            {
+                "id": segment.id,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+                "confidence": float(np.exp(segment.avg_logprob)),
+                "words": [
+                    {"word": word.word, "start": word.start, "end": word.end, "probability": word.probability}
+                    for word in (segment.words or [])
+                ]
+            }
+            for segment in segments_iter
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": info.language
+        }
+    
+    def _load_audio(self, audio_path: Union[str, bytes, bytearray, memoryview]) -> np.ndarray:
+        """
+        Decode audio of any format to 16 kHz mono samples.
+        
+        Raw bytes go straight to ffmpeg's stdin without a copy or temp file.
+        
+        Args:
+            audio_path: Path to the input audio file, raw audio bytes, or
+                base64-encoded audio (legacy), optionally as a data URL
             
-            return temp_wav_path
+        Returns:
+            Float32 samples in [-1, 1]
             
-        except Exception as e:
-            logger.error(f"Error converting audio format: {str(e)}")
-            raise
+        Raises:
+            FileNotFoundError: If a string is neither an existing path nor base64 audio
+        """
+        if isinstance(audio_path, str) and not os.path.exists(audio_path):
+            payload = audio_path.partition(";base64,")[2] if audio_path.startswith("data:") else audio_path
+            if not _BASE64_AUDIO_RE.fullmatch(payload):
+                raise FileNotFoundError(f"Audio file not found: {audio_path[:200]}")
+            audio_path = base64.b64decode(payload, validate=True)
+        return _ffmpeg_decode(audio_path)
     
     def _calculate_average_confidence(self, result: Dict[str, Any]) -> float:
         """Calculate average confidence score from segments."""
-        segments = result.get("segments", [])
-        if not segments:
-            return 0.0
+        segments = result.get("segments") or []
+        confidences = np.fromiter(
+            (segment.get("confidence", 0.0) for segment in segments),
+            dtype=np.float32,
+            count=len(segments)
+        )
+        return float(confidences.mean()) if confidences.size else 0.0
+    
+    def get_pronunciation_confidence(self, result: Dict[str, Any]) -> float:
+        """
+        Get the recognizer's confidence in a transcription, used for pronunciation scoring.
+        
+        Args:
+            result: Result of process_audio_data
             
-        confidences = [segment.get("confidence", 0) for segment in segments]
-        return sum(confidences) / len(confidences)
+        Returns:
+            Confidence between 0 and 1
+        """
+        confidence = result.get("confidence")
+        if confidence is None:
+            confidence = self._calculate_average_confidence(result)
+        return min(max(float(confidence), 0.0), 1.0)
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the current model."""
         return {
             "model_size": self.model_size,
             "is_local": self.use_local_model,
-            "device": "cuda" if torch.cuda.is_available() else "cpu",
+            "device": self.device,
+            "backend": "faster-whisper" if self.use_faster_whisper else "openai-whisper",
             "language": "ja",
             "supports_word_timestamps": True
         }
 
 class SpeechRecognizer:
-    def __init__(self, model_name: str = "base"):
+    def __init__(self, model_name: str = "base", warmup: bool = True, split_devices: bool = False):
         """
         Initialize the speech recognizer with Whisper model.
         
         Args:
             model_name: Name of the Whisper model to use
+            warmup: Run warmup() in a background thread so the first request
+                doesn't pay the one-off initialization cost
+            split_devices: Encode on the GPU and decode on the CPU, overlapping
+                the two phases across 30-second windows (needs CUDA and faster-whisper)
         """
+        self.use_faster_whisper = FASTER_WHISPER_AVAILABLE
+        self.encoder_model = None
+        self.batched = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         try:
-            self.model = whisper.load_model(model_name)
+            if self.use_faster_whisper:
+                device, compute_type = _faster_whisper_device()
+                if split_devices and device == "cuda":
+                    # Decoding moves to an int8 CPU model; the GPU only runs the encoder
+                    self.encoder_model = _load_model(model_name, "cuda", "float16")
+                    self.model = _load_model(model_name, "cpu", "int8")
+                else:
+                    self.model = _load_model(model_name, device, compute_type)
+                    self.batched = BatchedInferencePipeline(model=self.model)
+            else:
+                self.model = _load_model(model_name)
             logger.info(f"Loaded Whisper model: {model_name}")
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {str(e)}")
             raise
+        
+        if warmup:
+            threading.Thread(target=self.warmup, daemon=True).start()
+
+    def warmup(self) -> None:
+        """
+        Transcribe a silent clip to prime the model.
+        
+        The first inference allocates buffers and initializes kernels, which
+        otherwise shows up as a latency spike on the user's first utterance.
+        """
+        silence = np.zeros(WARMUP_SECONDS * WHISPER_SAMPLE_RATE, dtype=np.float32)
+        start = time.perf_counter()
+        try:
+            if self.use_faster_whisper:
+                # No VAD here: it would drop the silence before the encoder runs
+                segments, _ = self.model.transcribe(silence, language="ja", beam_size=1)
+                list(segments)
+                if self.encoder_model is not None:
+                    self._encode_window(silence)
+            else:
+                _whisper_transcribe(self.model, silence, language="ja", fp16=False)
+            logger.info(f"Whisper warmup finished in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            logger.warning(f"Whisper warmup failed: {str(e)}")
 
-    async def transcribe(self, audio_path: str, language: str = "ja") -> Dict[str, Any]:
+    async def transcribe(self, audio_path: Union[str, np.ndarray], language: str = "ja") -> Dict[str, Any]:
         """
         Transcribe audio file to text.
         
         Args:
-            audio_path: Path to audio file
+            audio_path: Path to audio file, or 16 kHz mono float32 samples
             language: Target language (default: Japanese)
             
         Returns:
             Dictionary containing transcription and metadata
         """
         try:
-            # Load and transcribe audio
-            result = self.model.transcribe(
-                audio_path,
-                language=language,
-                task="transcribe"
-            )
+            # Identical audio (e.g. a re-submitted drill clip) skips the model
+            key = await asyncio.to_thread(self._content_key, audio_path, language)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return dict(self._cache[key])
             
-            return {
+            # Load and transcribe audio off the event loop
+            if self.encoder_model is not None:
+                result = await self._transcribe_split(audio_path, language)
+            elif self.batched is not None:
+                result = await self._submit(audio_path, language)
+            else:
+                result = await self._transcribe_whisper(audio_path, language)
+            
+            transcription = {
                 "text": result["text"],
                 "segments": result["segments"],
                 "language": result.get("language", language),
                 "status": "success"
             }
+            self._cache[key] = transcription
+            if len(self._cache) > TRANSCRIPTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return dict(transcription)
             
         except Exception as e:
             logger.error(f"Transcription failed: {str(e)}")
@@ -209,6 +540,261 @@ class SpeechRecognizer:
                 "error": str(e)
             }
 
+    @staticmethod
+    def _content_key(audio_path: Union[str, np.ndarray], language: str) -> str:
+        """Hash the audio content (file bytes or samples) together with the language."""
+        hasher = blake3.blake3() if BLAKE3_AVAILABLE else hashlib.blake2b()
+        hasher.update(language.encode())
+        if isinstance(audio_path, np.ndarray):
+            hasher.update(np.ascontiguousarray(audio_path).tobytes())
+        else:
+            with open(audio_path, "rb") as f:
+                hasher.update(f.read())
+        return hasher.hexdigest()
+
+    async def _transcribe_whisper(self, audio_path: Union[str, np.ndarray], language: str) -> Dict[str, Any]:
+        """
+        Transcribe with openai-whisper in a single transcribe() call.
+        
+        The whole clip goes through one call, so whisper conditions each
+        30-second window on the text of the previous one. Audio is loaded
+        before taking the shared model's lock, so other requests can load
+        audio while this one decodes.
+        
+        Args:
+            audio_path: Path to audio file, or 16 kHz mono float32 samples
+            language: Target language
+            
+        Returns:
+            Dictionary with text, segments and language
+        """
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+        else:
+            import whisper
+            audio = await asyncio.to_thread(whisper.load_audio, audio_path)
+        
+        return await asyncio.to_thread(
+            _whisper_transcribe,
+            self.model,
+            audio,
+            language=language,
+            task="transcribe"
+        )
+
+    async def close(self) -> None:
+        """Stop the batch worker; the next transcribe() starts a new one."""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    async def _submit(self, audio_path: Union[str, np.ndarray], language: str) -> Dict[str, Any]:
+        """Queue a file for the next batched run and wait for its result."""
+        # The queue and worker belong to the loop that created them, so a
+        # finished worker or a new event loop gets a fresh pair
+        if (
+            self._worker is None
+            or self._worker.done()
+            or self._worker.get_loop() is not asyncio.get_running_loop()
+        ):
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._drain())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio_path, language, future))
+        return await future
+
+    async def _drain(self) -> None:
+        """Collect queued requests for up to BATCH_WAIT seconds and transcribe them together."""
+        loop = asyncio.get_running_loop()
+        while True:
+            requests = [await self._queue.get()]
+            deadline = loop.time() + BATCH_WAIT
+            while len(requests) < MAX_BATCH_REQUESTS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    requests.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # One batched run per language
+            by_language: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+            for audio_path, language, future in requests:
+                by_language.setdefault(language, []).append((audio_path, future))
+            
+            for language, group in by_language.items():
+                # Decode each file on its own, so an unreadable upload only
+                # fails its own request and the rest still run as a batch
+                audios = await asyncio.gather(
+                    *(asyncio.to_thread(self._decode, audio_path) for audio_path, _ in group),
+                    return_exceptions=True
+                )
+                decoded = []
+                for (_, future), audio in zip(group, audios):
+                    if not isinstance(audio, Exception):
+                        decoded.append((audio, future))
+                    elif not future.done():
+                        future.set_exception(audio)
+                group = decoded
+                if not group:
+                    continue
+                
+                try:
+                    results = await asyncio.to_thread(
+                        self._transcribe_batch, [audio for audio, _ in group], language
+                    )
+                except Exception as e:
+                    for _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), result in zip(group, results):
+                    if not future.done():
+                        future.set_result(result)
+
+    @staticmethod
+    def _decode(audio_path: Union[str, np.ndarray]) -> np.ndarray:
+        """Decode an audio file to 16 kHz mono samples; arrays are returned as is."""
+        if isinstance(audio_path, np.ndarray):
+            return audio_path
+        return decode_audio(audio_path, WHISPER_SAMPLE_RATE)
+
+    def _transcribe_batch(self, audio_paths: List[Union[str, np.ndarray]], language: str) -> List[Dict[str, Any]]:
+        """
+        Transcribe several files in one BatchedInferencePipeline run.
+        
+        The files are laid end to end and each file's speech regions (Silero
+        VAD, merged into windows of at most 30 s) are passed as clip timestamps,
+        so windows from different files share encoder/decoder batches. Segments
+        are then mapped back to their file by start time.
+        
+        Args:
+            audio_paths: Paths to audio files, or 16 kHz mono float32 samples
+            language: Target language
+            
+        Returns:
+            One dictionary with text, segments and language per file, in input order
+        """
+        # Cap merged windows at Whisper's 30 s input so each clip is one encoder pass
+        vad_options = VadOptions(**VAD_PARAMETERS, max_speech_duration_s=30)
+        audios = [self._decode(audio_path) for audio_path in audio_paths]
+        offsets = np.cumsum([0] + [len(audio) for audio in audios])
+        
+        # Clip timestamps are sample offsets into the concatenated audio
+        clips = []
+        for audio, offset in zip(audios, offsets):
+            for clip in merge_segments(get_speech_timestamps(audio, vad_options), vad_options):
+                clips.append({
+                    "start": int(offset + clip["start"]),
+                    "end": int(offset + clip["end"])
+                })
+        
+        results = [{"text": "", "segments": [], "language": language} for _ in audio_paths]
+        if not clips:
+            return results
+        
+        segments_iter, _ = self.batched.transcribe(
+            np.concatenate(audios),
+            language=language,
+            vad_filter=False,
+            clip_timestamps=clips,
+            batch_size=BATCH_SIZE,
+            beam_size=1
+        )
+        
+        # Gather segments column-wise, then assign files and shift times in
+        # vectorized passes; dicts are only built once per output segment
+        raw_segments = list(segments_iter)
+        segs = np.empty(len(raw_segments), dtype=SEGMENT_DTYPE)
+        for field in SEGMENT_DTYPE.names:
+            segs[field] = [getattr(segment, field) for segment in raw_segments]
+        
+        starts = offsets[:-1] / WHISPER_SAMPLE_RATE
+        owner = np.searchsorted(starts, segs["start"], side="right") - 1
+        segs["start"] -= starts[owner]
+        segs["end"] -= starts[owner]
+        
+        for index, result in enumerate(results):
+            file_segs = segs[owner == index]
+            result["segments"] = [
+                {
+                    "id": i,
+                    "start": start,
+                    "end": end,
+                    "text": text,
+                    "avg_logprob": avg_logprob,
+                    "no_speech_prob": no_speech_prob
+                }
+                for i, (start, end, avg_logprob, no_speech_prob, text) in enumerate(file_segs.tolist())
+            ]
+            result["text"] = "".join(file_segs["text"])
+        return results
+
+    async def _transcribe_split(self, audio_path: Union[str, np.ndarray], language: str) -> Dict[str, Any]:
+        """
+        Transcribe with the encoder on the GPU and the decoder on the CPU.
+        
+        The audio is cut into 30-second windows; while window k is decoded on
+        the CPU, window k+1 is encoded on the GPU. No VAD or timestamps are
+        used, so each window becomes one segment.
+        
+        Args:
+            audio_path: Path to audio file
+            language: Target language
+            
+        Returns:
+            Dictionary with text, segments and language
+        """
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+        else:
+            audio = await asyncio.to_thread(decode_audio, audio_path, WHISPER_SAMPLE_RATE)
+        windows = [audio[i:i + WINDOW_SAMPLES] for i in range(0, len(audio), WINDOW_SAMPLES)]
+        tokenizer = Tokenizer(
+            self.model.hf_tokenizer,
+            self.model.model.is_multilingual,
+            task="transcribe",
+            language=language
+        )
+        prompt = list(tokenizer.sot_sequence) + [tokenizer.no_timestamps]
+        
+        segments = []
+        encoded = await asyncio.to_thread(self._encode_window, windows[0]) if windows else None
+        for k in range(len(windows)):
+            jobs = [asyncio.to_thread(self._decode_window, encoded, prompt, tokenizer)]
+            if k + 1 < len(windows):
+                jobs.append(asyncio.to_thread(self._encode_window, windows[k + 1]))
+            text, *next_encoded = await asyncio.gather(*jobs)
+            if next_encoded:
+                encoded = next_encoded[0]
+            
+            start = k * WINDOW_SAMPLES / WHISPER_SAMPLE_RATE
+            segments.append({
+                "id": k,
+                "start": start,
+                "end": start + len(windows[k]) / WHISPER_SAMPLE_RATE,
+                "text": text
+            })
+        
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": language
+        }
+
+    def _encode_window(self, window: np.ndarray):
+        """Run the Whisper encoder on the GPU, returning the output in host memory."""
+        features = pad_or_trim(self.encoder_model.feature_extractor(window))
+        features = ctranslate2.StorageView.from_array(np.ascontiguousarray(features[np.newaxis]))
+        return self.encoder_model.model.encode(features, to_cpu=True)
+
+    def _decode_window(self, encoded, prompt: List[int], tokenizer) -> str:
+        """Greedy-decode one encoded window on the CPU model."""
+        result = self.model.model.generate(encoded, [prompt], beam_size=1)[0]
+        return tokenizer.decode(result.sequences_ids[0])
+
     async def process_audio_stream(self, audio_data: bytes) -> Dict[str, Any]:
         """
         Process audio data from a stream.
@@ -220,18 +806,9 @@ class SpeechRecognizer:
             Transcription results
         """
         try:
-            # Create temporary file to store audio data
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                temp_file.write(audio_data)
-                temp_path = temp_file.name
-
-            # Transcribe the temporary file
-            result = await self.transcribe(temp_path)
-            
-            # Clean up temporary file
-            os.unlink(temp_path)
-            
-            return result
+            # Decode in memory and hand the samples straight to the model
+            audio = await asyncio.to_thread(_ffmpeg_decode, audio_data)
+            return await self.transcribe(audio)
             
         except Exception as e:
             logger.error(f"Stream processing failed: {str(e)}")
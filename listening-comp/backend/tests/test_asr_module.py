@@ -0,0 +1,206 @@
+import asyncio
+import io
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from speech import asr_module
+from speech.asr_module import BatchedTranscriber, JapaneseASR
+
+
+@pytest.fixture
+def transcriber(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    return BatchedTranscriber(max_concurrent=2)
+
+
+def test_requests_are_sent_without_waiting_for_a_batch(transcriber):
+    async def run():
+        release = asyncio.Event()
+        in_flight = []
+        peak = []
+
+        async def transcribe_one(audio_file):
+            in_flight.append(audio_file)
+            peak.append(len(in_flight))
+            if audio_file.startswith("slow"):
+                await release.wait()
+            in_flight.remove(audio_file)
+            return {"text": audio_file}
+
+        transcriber._transcribe_one = transcribe_one
+
+        slow = [asyncio.create_task(transcriber.transcribe(f"slow{index}.wav")) for index in range(2)]
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(transcriber.transcribe("fast.wav"))
+        await asyncio.sleep(0.05)
+        # Both slots are taken, so the third request waits for one to free up
+        assert not queued.done()
+
+        release.set()
+        results = await asyncio.wait_for(asyncio.gather(*slow, queued), timeout=5)
+        await transcriber.close()
+        return results, max(peak)
+
+    results, peak = asyncio.run(run())
+
+    assert [result["text"] for result in results] == ["slow0.wav", "slow1.wav", "fast.wav"]
+    assert peak == 2
+
+
+def test_idle_request_is_sent_immediately(transcriber):
+    async def run():
+        async def transcribe_one(audio_file):
+            return {"text": audio_file}
+
+        transcriber._transcribe_one = transcribe_one
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await transcriber.transcribe("speech.wav")
+        elapsed = loop.time() - start
+        await transcriber.close()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(run())
+
+    assert result["text"] == "speech.wav"
+    assert elapsed < 0.03
+
+
+@pytest.mark.parametrize("name, content_type", [
+    ("speech.mp3", "audio/mpeg"),
+    ("speech.unknown", "application/octet-stream")
+])
+def test_upload_content_type_follows_file_extension(transcriber, tmp_path, name, content_type):
+    uploads = []
+
+    class FakeTranscriptions:
+        async def create(self, file, **kwargs):
+            uploads.append(file)
+            return types.SimpleNamespace(model_dump=lambda: {"text": "こんにちは", "segments": []})
+
+    transcriber.client = types.SimpleNamespace(audio=types.SimpleNamespace(transcriptions=FakeTranscriptions()))
+    audio_file = tmp_path / name
+    audio_file.write_bytes(b"audio")
+
+    result = asyncio.run(transcriber._transcribe_one(str(audio_file)))
+
+    assert result["text"] == "こんにちは"
+    assert uploads == [(name, b"audio", content_type)]
+
+
+def test_api_upload_streams_the_open_file_through_the_sdk(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    uploads = []
+
+    class FakeTranscriptions:
+        def create(self, file, **kwargs):
+            uploads.append(file)
+            return types.SimpleNamespace(model_dump=lambda: {"text": "こんにちは", "segments": []})
+
+    asr = JapaneseASR()
+    asr.client = types.SimpleNamespace(audio=types.SimpleNamespace(transcriptions=FakeTranscriptions()))
+    audio_file = tmp_path / "speech.mp3"
+    audio_file.write_bytes(b"audio")
+
+    with open(audio_file, "rb") as audio_data:
+        result = asr._transcribe_api(audio_data, "speech.mp3")
+
+    assert result["text"] == "こんにちは"
+    # The file object itself is handed over, so httpx reads it in chunks
+    assert uploads == [("speech.mp3", audio_data, "audio/mpeg")]
+
+
+def test_api_errors_are_reported_in_the_result(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    class RateLimited(Exception):
+        status_code = 429
+
+    class FakeTranscriptions:
+        def create(self, **kwargs):
+            raise RateLimited("slow down")
+
+    asr = JapaneseASR()
+    asr.client = types.SimpleNamespace(audio=types.SimpleNamespace(transcriptions=FakeTranscriptions()))
+
+    result = asr._transcribe_api(io.BytesIO(b"audio"), "speech.wav")
+
+    assert result["error"] is True
+    assert result["error_code"] == 429
+
+
+@pytest.fixture
+def fake_faster_whisper(monkeypatch):
+    """Stand-in faster_whisper module that records model construction."""
+    module = types.ModuleType("faster_whisper")
+    module.loaded = []
+
+    class WhisperModel:
+        def __init__(self, model_size, **kwargs):
+            module.loaded.append((model_size, kwargs))
+
+    class BatchedInferencePipeline:
+        def __init__(self, model):
+            self.model = model
+
+        def transcribe(self, audio, **kwargs):
+            segment = types.SimpleNamespace(
+                id=0, start=0.0, end=1.0, text=" こんにちは", avg_logprob=0.0, no_speech_prob=0.0
+            )
+            return iter([segment]), None
+
+    module.WhisperModel = WhisperModel
+    module.BatchedInferencePipeline = BatchedInferencePipeline
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    monkeypatch.setattr(asr_module, "FASTER_WHISPER_AVAILABLE", True)
+    return module
+
+
+def test_model_loads_on_first_transcription(fake_faster_whisper):
+    asr = JapaneseASR(model_size="tiny")
+    assert fake_faster_whisper.loaded == []
+
+    result = asr.transcribe_audio("speech.wav")
+    asr.transcribe_audio("speech.wav")
+
+    assert result["text"] == "こんにちは"
+    assert fake_faster_whisper.loaded == [("tiny", {"device": "cpu", "compute_type": "int8"})]
+    assert asr.client is None
+
+
+def test_api_client_is_created_only_without_local_model(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(asr_module, "FASTER_WHISPER_AVAILABLE", False)
+    asr = JapaneseASR()
+    assert asr.client is None
+
+    assert asr._get_pipeline() is None
+    assert asr.client is not None
+
+
+@pytest.mark.parametrize("kana, morae", [("わたし", 3), ("にほん", 3), ("きょう", 2), ("がっこう", 4), ("こーひー", 4)])
+def test_count_morae(kana, morae):
+    assert asr_module._count_morae(kana) == morae
+
+
+def test_pitch_accent_scores_only_the_word_morae(monkeypatch):
+    monkeypatch.setattr(asr_module, "PYWORLD_AVAILABLE", True)
+    # Look patterns up in PITCH_ACCENT_DICT rather than a built table
+    monkeypatch.setattr(asr_module, "_PITCH_TABLE", ())
+    asr = JapaneseASR()
+    asr._to_hiragana = lambda text: text
+    asr._extract_f0 = lambda audio_path: np.array([100.0, 200.0, 120.0])
+    scored = []
+
+    def score_pitch_pattern(f0, pattern):
+        scored.append(pattern)
+        return 1.0
+
+    asr._score_pitch_pattern = score_pitch_pattern
+
+    assert asr._evaluate_pitch_accent("わたし", "わたし", audio_path="speech.wav") == 1.0
+    # The dictionary entry's fourth mark is the following particle
+    assert scored == [[0, 1, 0]]
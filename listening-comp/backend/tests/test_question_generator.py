@@ -0,0 +1,152 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+from question_generator import QuestionGenerator
+
+
+def make_question(text):
+    return {
+        "question": text,
+        "options": ["A", "B", "C", "D"],
+        "correctAnswer": "A",
+        "explanation": "Because."
+    }
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    generator = QuestionGenerator()
+    generator.calls = []
+    return generator
+
+
+def stub_api(generator, response):
+    async def call_openai_api(system_prompt, user_prompt, model=None, max_tokens=2000):
+        generator.calls.append({"user_prompt": user_prompt, "max_tokens": max_tokens})
+        return response
+
+    generator._call_openai_api = call_openai_api
+
+
+def request(transcript, num_questions=5, include_answers=True):
+    return {
+        "transcript": transcript,
+        "jlpt_level": "N4",
+        "num_questions": num_questions,
+        "include_answers": include_answers
+    }
+
+
+def run_batch(generator, requests):
+    async def run():
+        loop = asyncio.get_running_loop()
+        group = [(item, loop.create_future()) for item in requests]
+        await generator._run_batch(group)
+        return [future for _, future in group]
+
+    return asyncio.run(run())
+
+
+def test_run_batch_single_request(generator):
+    stub_api(generator, json.dumps([make_question("一")]))
+
+    (future,) = run_batch(generator, [request("こんにちは", include_answers=False)])
+
+    questions = future.result()
+    assert [question["question"] for question in questions] == ["一"]
+    assert "correctAnswer" not in questions[0]
+    assert generator.calls[0]["max_tokens"] == 2000
+
+
+def test_run_batch_splits_batched_response(generator):
+    stub_api(generator, json.dumps({"results": [
+        {"index": 1, "questions": [make_question("二")]},
+        {"index": 0, "questions": [make_question("一")]}
+    ]}))
+
+    first, second = run_batch(generator, [request("一つ目", 3), request("二つ目", 4)])
+
+    assert [question["question"] for question in first.result()] == ["一"]
+    assert [question["question"] for question in second.result()] == ["二"]
+    assert len(generator.calls) == 1
+    # The completion budget grows with the total number of questions
+    assert generator.calls[0]["max_tokens"] == 7 * generator._tokens_per_question
+
+
+def test_run_batch_fails_only_requests_missing_from_response(generator):
+    stub_api(generator, json.dumps({"results": [{"index": 0, "questions": [make_question("一")]}]}))
+
+    first, second = run_batch(generator, [request("一つ目"), request("二つ目")])
+
+    assert first.result()[0]["question"] == "一"
+    with pytest.raises(ValueError):
+        second.result()
+
+
+def test_run_batch_propagates_api_errors(generator):
+    async def failing_api(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    generator._call_openai_api = failing_api
+
+    futures = run_batch(generator, [request("一つ目"), request("二つ目")])
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result()
+
+
+def test_split_by_question_budget(generator):
+    group = [(request(str(index), num_questions), None) for index, num_questions in enumerate([4, 4, 4, 12, 1])]
+
+    batches = generator._split_by_question_budget(group)
+
+    assert [[item["transcript"] for item, _ in batch] for batch in batches] == [["0", "1"], ["2"], ["3"], ["4"]]
+
+
+def test_solo_request_is_not_held_for_batch_window(generator):
+    stub_api(generator, json.dumps([make_question("一")]))
+    generator._batch_window = 60
+
+    async def run():
+        try:
+            return await asyncio.wait_for(generator.generate("こんにちは"), timeout=5)
+        finally:
+            generator._batch_worker_task.cancel()
+
+    questions = asyncio.run(run())
+
+    assert questions[0]["question"] == "一"
+
+
+def test_responses_chain_resets_past_token_budget(generator):
+    class FakeResponses:
+        def __init__(self):
+            self.previous_ids = []
+
+        async def create(self, previous_response_id=None, **kwargs):
+            self.previous_ids.append(previous_response_id)
+            index = len(self.previous_ids)
+            # Each follow-up is billed for the whole chain so far
+            input_tokens = 4000 * (1 if previous_response_id is None else 2)
+            return types.SimpleNamespace(
+                id=f"resp_{index}",
+                output_text="[]",
+                usage=types.SimpleNamespace(input_tokens=input_tokens)
+            )
+
+    responses = FakeResponses()
+    generator.client = types.SimpleNamespace(responses=responses)
+
+    async def run():
+        for _ in range(3):
+            await generator._call_responses_api("system", "user", "N4")
+
+    asyncio.run(run())
+
+    # resp_2 used 8000 input tokens, over the 6000 budget, so the third call starts fresh
+    assert responses.previous_ids == [None, "resp_1", None]
@@ -0,0 +1,221 @@
+import asyncio
+import base64
+import types
+
+import numpy as np
+import pytest
+
+import speech_recognition
+from speech_recognition import JapaneseSpeechRecognition, SpeechRecognizer, WHISPER_SAMPLE_RATE
+
+
+class FakeVadOptions:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class FakeBatchedPipeline:
+    """Returns one segment per clip, timed like faster-whisper (absolute seconds)."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, clip_timestamps, **kwargs):
+        self.calls.append({"audio": audio, "clip_timestamps": clip_timestamps, **kwargs})
+        segments = [
+            types.SimpleNamespace(
+                start=clip["start"] / WHISPER_SAMPLE_RATE,
+                end=clip["end"] / WHISPER_SAMPLE_RATE,
+                text=f"clip{index}",
+                avg_logprob=-0.1,
+                no_speech_prob=0.01
+            )
+            for index, clip in enumerate(clip_timestamps)
+        ]
+        return iter(segments), None
+
+
+@pytest.fixture
+def recognizer(monkeypatch):
+    """SpeechRecognizer with a stubbed pipeline and a VAD that keeps non-silent audio."""
+    monkeypatch.setattr(speech_recognition, "VadOptions", FakeVadOptions, raising=False)
+    monkeypatch.setattr(
+        speech_recognition,
+        "get_speech_timestamps",
+        lambda audio, options: [{"start": 0, "end": len(audio)}] if audio.any() else [],
+        raising=False
+    )
+    monkeypatch.setattr(speech_recognition, "merge_segments", lambda segments, options: segments, raising=False)
+
+    instance = SpeechRecognizer.__new__(SpeechRecognizer)
+    instance.batched = FakeBatchedPipeline()
+    return instance
+
+
+def test_transcribe_batch_passes_sample_offsets(recognizer):
+    first = np.ones(2 * WHISPER_SAMPLE_RATE, dtype=np.float32)
+    second = np.ones(WHISPER_SAMPLE_RATE, dtype=np.float32)
+
+    results = recognizer._transcribe_batch([first, second], "ja")
+
+    call = recognizer.batched.calls[0]
+    assert call["clip_timestamps"] == [
+        {"start": 0, "end": 2 * WHISPER_SAMPLE_RATE},
+        {"start": 2 * WHISPER_SAMPLE_RATE, "end": 3 * WHISPER_SAMPLE_RATE}
+    ]
+    assert all(isinstance(clip["start"], int) for clip in call["clip_timestamps"])
+    assert len(call["audio"]) == 3 * WHISPER_SAMPLE_RATE
+
+    assert [result["text"] for result in results] == ["clip0", "clip1"]
+    assert results[0]["segments"][0]["start"] == pytest.approx(0.0)
+    assert results[0]["segments"][0]["end"] == pytest.approx(2.0)
+    # Second file's timestamps are relative to its own start
+    assert results[1]["segments"][0]["start"] == pytest.approx(0.0)
+    assert results[1]["segments"][0]["end"] == pytest.approx(1.0)
+
+
+def test_transcribe_batch_skips_pipeline_for_silence(recognizer):
+    silence = np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+
+    results = recognizer._transcribe_batch([silence, silence], "ja")
+
+    assert recognizer.batched.calls == []
+    assert results == [
+        {"text": "", "segments": [], "language": "ja"},
+        {"text": "", "segments": [], "language": "ja"}
+    ]
+
+
+def test_undecodable_file_fails_only_its_own_request(recognizer, monkeypatch):
+    def decode_audio(audio_path, sampling_rate):
+        if audio_path == "broken.wav":
+            raise ValueError("invalid data")
+        return np.ones(WHISPER_SAMPLE_RATE, dtype=np.float32)
+
+    monkeypatch.setattr(speech_recognition, "decode_audio", decode_audio, raising=False)
+    recognizer._queue = None
+    recognizer._worker = None
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                recognizer._submit("good.wav", "ja"),
+                recognizer._submit("broken.wav", "ja"),
+                return_exceptions=True
+            )
+        finally:
+            await recognizer.close()
+
+    good, broken = asyncio.run(run())
+
+    assert good["text"] == "clip0"
+    assert isinstance(broken, ValueError)
+    # Only the decodable file reached the pipeline
+    assert len(recognizer.batched.calls[0]["audio"]) == WHISPER_SAMPLE_RATE
+
+
+def test_batch_worker_is_recreated_for_each_event_loop(recognizer):
+    recognizer._queue = None
+    recognizer._worker = None
+    audio = np.ones(WHISPER_SAMPLE_RATE, dtype=np.float32)
+
+    async def run():
+        return await asyncio.wait_for(recognizer._submit(audio, "ja"), timeout=5)
+
+    # The second loop must not reuse the first loop's (now closed) worker
+    assert asyncio.run(run())["text"] == "clip0"
+    assert asyncio.run(run())["text"] == "clip0"
+
+    asyncio.run(recognizer.close())
+    assert recognizer._worker is None
+
+
+def test_whisper_linears_are_swapped_before_quantization():
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("whisper")
+    from whisper.model import Linear as WhisperLinear
+
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(
+        WhisperLinear(8, 16),
+        torch.nn.ReLU(),
+        torch.nn.Sequential(WhisperLinear(16, 4, bias=False))
+    ).eval()
+    inputs = torch.randn(2, 8)
+    expected = model(inputs)
+
+    speech_recognition._replace_whisper_linears(model)
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    modules = list(quantized.modules())
+    assert sum(isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in modules) == 2
+    assert not any(isinstance(module, WhisperLinear) for module in modules)
+    # int8 weights stay close to the float32 layers they replaced
+    assert torch.allclose(quantized(inputs), expected, atol=0.1)
+
+
+def test_openai_whisper_decodes_whole_clip_in_one_call():
+    class FakeWhisperModel:
+        def __init__(self):
+            self.calls = []
+
+        def transcribe(self, audio, **options):
+            self.calls.append((audio, options))
+            return {"text": "こんにちは", "segments": [], "language": "ja"}
+
+    recognizer = SpeechRecognizer.__new__(SpeechRecognizer)
+    recognizer.model = FakeWhisperModel()
+    audio = np.ones(25 * WHISPER_SAMPLE_RATE, dtype=np.float32)
+
+    result = asyncio.run(recognizer._transcribe_whisper(audio, "ja"))
+
+    # One call over the whole clip: no extra encoder passes, and whisper keeps
+    # the previous window's text as context
+    assert len(recognizer.model.calls) == 1
+    (passed, options), = recognizer.model.calls
+    assert passed is audio
+    assert options == {"language": "ja", "task": "transcribe"}
+    assert result["text"] == "こんにちは"
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    """Capture what JapaneseSpeechRecognition._load_audio hands to ffmpeg."""
+    sources = []
+
+    def ffmpeg_decode(source):
+        sources.append(source)
+        return np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32)
+
+    monkeypatch.setattr(speech_recognition, "_ffmpeg_decode", ffmpeg_decode)
+    return sources
+
+
+def test_load_audio_decodes_base64_payloads(decoded):
+    recognition = JapaneseSpeechRecognition.__new__(JapaneseSpeechRecognition)
+    audio = bytes(range(256))
+    encoded = base64.b64encode(audio).decode()
+
+    recognition._load_audio(encoded)
+    recognition._load_audio(f"data:audio/wav;base64,{encoded}")
+
+    assert decoded == [audio, audio]
+
+
+@pytest.mark.parametrize("missing", ["recording.wav", "/tmp/missing/recording", "abcd", "data:audio/wav;base64,@@@@"])
+def test_load_audio_rejects_missing_paths(decoded, missing):
+    recognition = JapaneseSpeechRecognition.__new__(JapaneseSpeechRecognition)
+
+    with pytest.raises(FileNotFoundError):
+        recognition._load_audio(missing)
+    assert decoded == []
+
+
+def test_load_audio_passes_existing_paths_through(decoded, tmp_path):
+    recognition = JapaneseSpeechRecognition.__new__(JapaneseSpeechRecognition)
+    path = tmp_path / "recording.wav"
+    path.write_bytes(b"RIFF")
+
+    recognition._load_audio(str(path))
+
+    assert decoded == [str(path)]
@@ -0,0 +1,136 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pytest
+
+from services import tts_service
+from services.tts_service import JapaneseTTSService, RegionalAccent
+
+
+class FakePolly:
+    """Records requests and returns the request text as the audio bytes."""
+
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def describe_voices(self, **kwargs):
+        return {'Voices': [{'Id': 'Mizuki', 'Gender': 'Female', 'SupportedEngines': ['standard']}]}
+
+    def synthesize_speech(self, **kwargs):
+        with self._lock:
+            self.requests.append(kwargs)
+        return {'AudioStream': io.BytesIO(kwargs['Text'].encode('utf-8'))}
+
+
+@pytest.fixture(autouse=True)
+def empty_mem_cache(monkeypatch):
+    monkeypatch.setattr(tts_service, "_MEM_CACHE", OrderedDict())
+
+
+@pytest.fixture
+def polly(monkeypatch):
+    client = FakePolly()
+    monkeypatch.setattr(tts_service, "_get_polly_client", lambda: client)
+    monkeypatch.delenv("GOOGLE_APPLICATION_CREDENTIALS", raising=False)
+    return client
+
+
+@pytest.fixture
+def service(polly, tmp_path):
+    return JapaneseTTSService(output_dir=str(tmp_path))
+
+
+def test_long_text_is_synthesized_in_chunks(service, polly, monkeypatch):
+    monkeypatch.setattr(tts_service, "_CHUNK_CHARS", 10)
+    text = "".join(f"これは{index}番目の文です。" for index in range(5))
+
+    file_path, audio = service.synthesize_speech(text)
+
+    assert len(polly.requests) > 1
+    assert all(len(request['Text']) <= 10 for request in polly.requests)
+    # Chunks are joined back in order
+    assert audio == text.encode('utf-8')
+    with open(file_path, 'rb') as file:
+        assert file.read() == audio
+
+
+def test_ssml_input_is_not_chunked(service, polly, monkeypatch):
+    monkeypatch.setattr(tts_service, "_CHUNK_CHARS", 10)
+    text = "<speak>" + "これはテストです。<break time='300ms'/>" * 5 + "</speak>"
+
+    _, audio = service.synthesize_speech(text, save_to_file=False)
+
+    assert len(polly.requests) == 1
+    assert polly.requests[0]['TextType'] == 'ssml'
+    assert polly.requests[0]['Text'] == text
+    assert audio == text.encode('utf-8')
+
+
+def test_accent_ssml_is_not_chunked(service, polly, monkeypatch):
+    monkeypatch.setattr(tts_service, "_CHUNK_CHARS", 10)
+
+    service.synthesize_speech("大阪です。" * 5, accent=RegionalAccent.KANSAI, save_to_file=False)
+
+    assert len(polly.requests) == 1
+    assert polly.requests[0]['TextType'] == 'ssml'
+
+
+def test_memory_cache_is_shared_between_instances(service, polly, tmp_path):
+    _, first = service.synthesize_speech("こんにちは", save_to_file=False)
+    # Drop the disk tier so only the memory tier can serve the repeat
+    for name in os.listdir(service._cache_dir):
+        os.remove(os.path.join(service._cache_dir, name))
+
+    other = JapaneseTTSService(output_dir=str(tmp_path / "other"))
+    _, second = other.synthesize_speech("こんにちは", save_to_file=False)
+
+    assert second == first
+    assert len(polly.requests) == 1
+
+
+def test_memory_cache_evicts_least_recently_used(service, polly, monkeypatch):
+    monkeypatch.setattr(tts_service, "_MEM_CACHE_SIZE", 2)
+
+    for text in ("一", "二", "一", "三"):
+        service.synthesize_speech(text, save_to_file=False)
+
+    assert len(tts_service._MEM_CACHE) == 2
+    assert [request['Text'] for request in polly.requests] == ["一", "二", "三"]
+    cached = set(tts_service._MEM_CACHE.values())
+    assert cached == {"一".encode('utf-8'), "三".encode('utf-8')}
+
+
+def test_cached_file_is_named_by_request_hash(service, polly):
+    file_path, audio = service.synthesize_speech("こんにちは")
+
+    key = service._cache_key(
+        provider="aws_polly", text="こんにちは", voice_id=None, speaking_rate=1.0,
+        pitch=0.0, volume=0.0, ssml=False, output_format='mp3'
+    )
+    assert file_path == os.path.join(service._cache_dir, f"{key[:16]}.mp3")
+    with open(file_path, 'rb') as file:
+        assert file.read() == audio
+    assert os.path.exists(os.path.splitext(file_path)[0] + tts_service._SIDECAR_SUFFIX)
+
+
+def test_disk_cache_serves_repeats_without_rewriting(service, polly, monkeypatch):
+    file_path, audio = service.synthesize_speech("こんにちは")
+    modified = os.stat(file_path).st_mtime_ns
+
+    # Empty the memory tier so the repeat is served from disk
+    monkeypatch.setattr(tts_service, "_MEM_CACHE", OrderedDict())
+    repeat_path, repeat_audio = service.synthesize_speech("こんにちは ")
+
+    assert (repeat_path, repeat_audio) == (file_path, audio)
+    assert os.stat(file_path).st_mtime_ns == modified
+    assert len(polly.requests) == 1
+
+
+def test_unsaved_synthesis_returns_no_path(service, polly):
+    file_path, audio = service.synthesize_speech("こんにちは", save_to_file=False)
+
+    assert file_path == ""
+    assert audio == "こんにちは".encode('utf-8')
@@ -312,7 +312,8 @@ def record_and_evaluate(reference_text):
                 # Evaluate pronunciation
                 evaluation = st.session_state.asr.evaluate_pronunciation(
                     reference_text, 
-                    transcription["text"]
+                    transcription["text"],
+                    audio_path=audio_file
                 )
                 st.session_state.last_evaluation = evaluation
                 